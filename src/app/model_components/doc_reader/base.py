@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 from ..base_component import BaseComponent
@@ -28,6 +29,26 @@ class BaseDocReader(BaseComponent, ABC):
         """
         pass
 
+    def read_many(self, sources: list[str | list | dict],
+                  max_workers: int | None = None) -> list[str | bytes | list | dict]:
+        """批量读取多个数据源，返回结果与输入顺序一一对应。
+
+        文件读取会释放 GIL，使用线程池可以让多个文件的磁盘 I/O 相互重叠。
+
+        Args:
+            sources (list[Union[str, list, dict]]): 数据源列表，元素与 `read_data` 的入参一致。
+            max_workers (int | None): 线程池大小，默认为 min(32, 数据源数量)。
+
+        Returns:
+            list[Union[str, bytes, list, dict]]: 每个数据源读取到的原始内容。
+
+        """
+        if len(sources) <= 1:
+            return [self.read_data(source) for source in sources]
+
+        with ThreadPoolExecutor(max_workers=max_workers or min(32, len(sources))) as executor:
+            return list(executor.map(self.read_data, sources))
+
     @abstractmethod
     def parse_content(self, raw_content: str | bytes) -> dict[str, Any]:
         """对原始内容进行解析，可根据具体文档类型做结构化处理。
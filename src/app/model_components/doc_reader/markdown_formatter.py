@@ -1,3 +1,7 @@
+from collections.abc import Callable, Iterable
+from functools import lru_cache
+from itertools import chain
+from operator import itemgetter
 from typing import Any
 
 
@@ -6,37 +10,69 @@ class MarkdownFormatter:
     """
 
     @staticmethod
-    def convert_paragraphs(paragraphs: list[str]) -> str:
+    def convert_paragraphs(paragraphs: Iterable[str]) -> str:
         """将一系列段落转换为 Markdown 格式（简单示例）。
         """
         return "\n\n".join(paragraphs)
 
     @staticmethod
-    def convert_table(table_data: list[dict[str, Any]]) -> str:
+    def convert_table(table_data: Iterable[dict[str, Any]]) -> str:
         """将结构化数据(例如 CSV 解析后的列表) 转换为 Markdown 表格。
         
-        table_data: List[Dict[str, Any]]，如:
+        table_data: Iterable[Dict[str, Any]]，可以是列表或流式产出的行，如:
             [{"name": "Alice", "age": 18}, {"name": "Bob", "age": 20}]
         """
-        if not table_data:
+        rows = iter(table_data)
+        first_row = next(rows, None)
+        if first_row is None:
             return ""
 
-        headers = list(table_data[0].keys())
-        header_row = "| " + " | ".join(headers) + " |"
-        split_row = "| " + " | ".join(["---"] * len(headers)) + " |"
+        table_head, row_template, get_cells = _table_layout(tuple(first_row.keys()))
+        body = "\n".join(row_template.format(*get_cells(row)) for row in chain((first_row,), rows))
 
-        body_rows = []
-        for row in table_data:
-            row_cells = [str(row[h]) for h in headers]
-            body_rows.append("| " + " | ".join(row_cells) + " |")
+        return f"{table_head}\n{body}"
 
-        return "\n".join([header_row, split_row] + body_rows)
+    @staticmethod
+    def convert_tables(tables: Iterable[Iterable[dict[str, Any]]]) -> str:
+        """批量将多个表格转换为 Markdown，表格之间以空行分隔。
+
+        表头相同的表格共用同一份行模板与取值器，适合一次转换大量同构的小表格。
+        """
+        return "\n\n".join(
+            markdown for markdown in map(MarkdownFormatter.convert_table, tables) if markdown
+        )
 
     @staticmethod
     def convert_key_values(data: dict[str, Any]) -> str:
         """将键值对转为 Markdown 列表或其他合适格式。只作演示示例。
         """
-        lines = []
-        for key, value in data.items():
-            lines.append(f"- **{key}**: {value}")
-        return "\n".join(lines)
+        return "\n".join(f"- **{key}**: {value}" for key, value in data.items())
+
+
+@lru_cache(maxsize=256)
+def _table_layout(headers: tuple[str, ...]) -> tuple[str, str, Callable[[dict[str, Any]], tuple]]:
+    """根据表头生成表头两行、行模板以及取值器，按表头缓存以便同构表格复用。
+
+    Args:
+        headers (tuple[str, ...]): 表头。
+
+    Returns:
+        tuple[str, str, Callable]: (表头与分隔行, 行格式模板, 按表头顺序取出单元格的函数)。
+
+    """
+    header_row = "| " + " | ".join(headers) + " |"
+    split_row = "| " + " | ".join(["---"] * len(headers)) + " |"
+
+    # 预先生成整行的格式模板，"{}" 会隐式调用 str()，避免逐单元格拼接
+    row_template = "| " + " | ".join(["{}"] * len(headers)) + " |"
+    if len(headers) == 1:
+        # 单列时 itemgetter 返回的是值本身而不是元组
+        key = headers[0]
+
+        def get_cells(row: dict[str, Any]) -> tuple:
+            return (row[key],)
+    else:
+        # itemgetter 在 C 层一次取出整行的所有单元格
+        get_cells = itemgetter(*headers)
+
+    return f"{header_row}\n{split_row}", row_template, get_cells
@@ -1,12 +1,53 @@
 import csv
 import json
 import os
+from collections.abc import Iterator
+from itertools import chain
 from typing import Any
 
+try:
+    import ijson
+except ImportError:  # 未安装 ijson 时大文件也整体解析
+    ijson = None
+
 from .base import BaseDocReader
 from .markdown_formatter import MarkdownFormatter
 
 
+# 超过该大小的 JSON 数组文件改为逐条流式解析（需要安装 ijson）
+STREAM_JSON_MIN_BYTES = 64 * 1024 * 1024
+
+# 判断迭代器是否为空时使用的哨兵，JSON 中的 null 也是合法元素
+_EMPTY = object()
+
+
+def _dict_rows(rows: Iterator[Any]) -> Iterator[dict[str, Any]]:
+    """逐行确认流式读取的数组元素都是对象，遇到其他类型时报错而不是输出错乱的表格。
+
+    Args:
+        rows (Iterator[Any]): 流式产出的数组元素。
+
+    Yields:
+        dict[str, Any]: 表格的一行。
+
+    Raises:
+        ValueError: 数组中混有非对象元素时抛出。
+
+    """
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            raise ValueError(
+                f"JSON 数组第 {index} 个元素不是对象（{type(row).__name__}），流式读取时无法按表格输出。"
+            )
+        yield row
+
+
+class _CsvRows(list):
+    """CSV 文件解析出的行，每个元素都是 dict，判定类型时无需逐个检查。"""
+
+    __slots__ = ()
+
+
 class StructuredDocReader(BaseDocReader):
     """用于读取结构化文件的示例 Reader，如 CSV、JSON 等。
     """
@@ -56,12 +97,22 @@ class StructuredDocReader(BaseDocReader):
             ValueError: 如果 `raw_content` 格式不受支持，将抛出异常。
 
         """
-        if isinstance(raw_content, dict):
+        if isinstance(raw_content, Iterator):
+            # 流式读取的 JSON 数组：只取出首个元素判定类型，其余保持惰性；
+            # 后续元素无法预先检查，按表格输出时逐行确认都是对象
+            first = next(raw_content, _EMPTY)
+            if first is _EMPTY:
+                return {"type": "list", "data": []}
+            data = chain((first,), raw_content)
+            if type(first) is dict:
+                return {"type": "list_of_dict", "data": _dict_rows(data)}
+            return {"type": "list", "data": data}
+        elif isinstance(raw_content, dict):
             # 例如 JSON 对象
             return {"type": "dict", "data": raw_content}
         elif isinstance(raw_content, list):
-            # 可能是 CSV 或 JSON array
-            if all(isinstance(x, dict) for x in raw_content):
+            # CSV 的每一行都是 dict，直接按表格处理；其他来源的列表可能混有非 dict 元素，需要逐个确认
+            if isinstance(raw_content, _CsvRows) or all(isinstance(x, dict) for x in raw_content):
                 return {"type": "list_of_dict", "data": raw_content}
             else:
                 return {"type": "list", "data": raw_content}
@@ -84,6 +135,7 @@ class StructuredDocReader(BaseDocReader):
             return MarkdownFormatter.convert_table(data)
         elif data_type == "list":
             # 简单地把每个元素都当做段落
+            # 先构造列表再 join，str.join 对列表可以预先计算总长度，比逐段写入更快
             return MarkdownFormatter.convert_paragraphs([str(x) for x in data])
         else:
             raise ValueError("Unsupported data type for markdown conversion.")
@@ -91,22 +143,45 @@ class StructuredDocReader(BaseDocReader):
     def _read_csv_file(self, filepath: str) -> list[dict[str, Any]]:
         """CSV 文件解析
         """
-        rows = []
-        with open(filepath, encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                rows.append(dict(row))
-        return rows
-
-    def _read_json_file(self, filepath: str) -> dict | list:
+        # newline="" 关闭换行符转换，由 csv 模块自行处理行尾（含引号内的换行）
+        with open(filepath, encoding="utf-8", newline="") as f:
+            # DictReader 本身就产出 dict 且所有行共享同一组表头字符串，无需再拷贝一份
+            return _CsvRows(csv.DictReader(f))
+
+    def _read_json_file(self, filepath: str) -> dict | list | Iterator[Any]:
         """解析 JSON 文件。
 
+        超大的 JSON 数组文件在安装了 ijson 时返回逐条产出元素的迭代器，
+        下游的 Markdown 转换可以边解析边输出，不必先构造完整列表。
+
         Args:
             filepath (str): JSON 文件的路径。
 
         Returns:
-            Union[dict, list]: 解析后的 JSON 数据，可以是字典或列表。
+            Union[dict, list, Iterator]: 解析后的 JSON 数据，可以是字典、列表或数组元素迭代器。
 
         """
-        with open(filepath, encoding="utf-8") as f:
+        if (ijson is not None
+                and os.path.getsize(filepath) >= STREAM_JSON_MIN_BYTES
+                and self._is_json_array(filepath)):
+            return self._stream_json_array(filepath)
+
+        # 文档内容需要原样保留，这里使用标准库 json 而不是 orjson：orjson 会把超出 64 位的整数
+        # 静默转成浮点数，也不接受 NaN/Infinity，与流式解析（ijson）的结果也会不一致
+        with open(filepath, "rb") as f:
             return json.load(f)
+
+    @staticmethod
+    def _is_json_array(filepath: str) -> bool:
+        """判断 JSON 文件的顶层结构是否为数组。
+        """
+        with open(filepath, "rb") as f:
+            head = f.read(4096).lstrip(b"\xef\xbb\xbf \t\r\n")
+        return head.startswith(b"[")
+
+    @staticmethod
+    def _stream_json_array(filepath: str) -> Iterator[Any]:
+        """逐个产出 JSON 数组中的元素。
+        """
+        with open(filepath, "rb") as f:
+            yield from ijson.items(f, "item", use_float=True)
@@ -39,7 +39,8 @@ class UnstructuredDocReader(BaseDocReader):
         
         返回一个键为 paragraphs 的字典，方便后续 Markdown 转换。
         """
-        paragraphs = [p.strip() for p in raw_content.split("\n") if p.strip()]
+        # 每行只 strip 一次，再过滤空行
+        paragraphs = [p for p in map(str.strip, raw_content.split("\n")) if p]
         return {"paragraphs": paragraphs}
 
     def to_markdown(self, parsed_data: dict[str, Any]) -> str:
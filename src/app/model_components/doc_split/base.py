@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable
 
 from ..base_component import BaseComponent
 from .dto import SplitParameter, SplitResult
@@ -53,4 +54,26 @@ class DocSplitBase(BaseComponent, ABC):
             Processed segments
 
         """
-        return [seg.strip() for seg in segments if seg.strip()]
+        return [seg for seg in map(str.strip, segments) if seg]
+
+    def _normalize_and_split(self, text: str, splitter_fn: Callable[[str], Iterable[str]]) -> list[str]:
+        """Preprocess the text, split it and post-process the segments in a single pass.
+        
+        Fuses ``_preprocess_text`` and ``_postprocess_segments``: segments produced by
+        ``splitter_fn`` are stripped and filtered as they are emitted, so no intermediate
+        list of raw segments is built and each segment is stripped exactly once.
+        
+        Args:
+            text: Raw input text
+            splitter_fn: Callable that splits the preprocessed text, may be a generator
+            
+        Returns:
+            Non-empty, stripped segments
+
+        """
+        segments = []
+        for seg in splitter_fn(self._preprocess_text(text)):
+            seg = seg.strip()
+            if seg:
+                segments.append(seg)
+        return segments
@@ -1,5 +1,7 @@
 """Constants for document splitting operations."""
 
+import re
+
 # Default configurations
 DEFAULT_MIN_LENGTH = 50
 DEFAULT_MAX_LENGTH = 1000
@@ -10,6 +12,15 @@ SENTENCE_END_PATTERN = r'([.!?])\s+'
 MARKDOWN_HEADER_PATTERN = r'\n#{1,6}\s'
 MARKDOWN_HR_PATTERN = r'\n(?:\*\*\*|\-\-\-)\n'
 
+# Precompiled once at import so callers never go through re's internal cache
+SENTENCE_END_RE = re.compile(SENTENCE_END_PATTERN)
+
 # Embedding Model
 DEFAULT_EMBEDDING_MODEL = "jina-embeddings-v3"
 DEFAULT_SIMILARITY_THRESHOLD = 70
+# Length units for SplitParameter.length_unit; "tokens" counts with tiktoken
+LENGTH_UNIT_CHARS = "chars"
+LENGTH_UNIT_TOKENS = "tokens"
+DEFAULT_TOKEN_ENCODING = "cl100k_base"
+# Per-splitter LRU of segment embeddings, keyed by content hash
+EMBEDDING_CACHE_SIZE = 4096
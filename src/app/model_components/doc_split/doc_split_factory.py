@@ -1,6 +1,7 @@
 # app/model_components/doc_split/factory.py
 
 from enum import Enum
+from types import MappingProxyType
 from typing import Any
 
 from ..model.embedding import OpenAiStyleEmbeddings
@@ -15,6 +16,36 @@ class SplitterType(Enum):
     FORMAT = "format"
     SEMANTIC = "semantic"
 
+def _create_format_splitter(
+    embedding_model: OpenAiStyleEmbeddings | None,
+    **kwargs: dict[str, Any]
+) -> DocSplitBase:
+    """Return the shared FormatSplitter; it holds no per-instance state."""
+    if kwargs:
+        return FormatSplitter(**kwargs)
+    return _FORMAT_SPLITTER
+
+
+def _create_semantic_splitter(
+    embedding_model: OpenAiStyleEmbeddings | None,
+    **kwargs: dict[str, Any]
+) -> DocSplitBase:
+    """Create a SemanticSplitterWithEmbedding bound to the given embedding model."""
+    return SemanticSplitterWithEmbedding(
+        embedding_model=embedding_model,
+        **kwargs
+    )
+
+
+_FORMAT_SPLITTER = FormatSplitter()
+
+# Built once at import; create_splitter resolves the builder with a single lookup
+_SPLITTER_BUILDERS = MappingProxyType({
+    SplitterType.FORMAT: _create_format_splitter,
+    SplitterType.SEMANTIC: _create_semantic_splitter,
+})
+
+
 class DocSplitterFactory:
     """Factory class for creating document splitters."""
     
@@ -38,12 +69,8 @@ class DocSplitterFactory:
             ValueError: If splitter_type is not recognized
 
         """
-        if splitter_type == SplitterType.FORMAT:
-            return FormatSplitter(**kwargs)
-        elif splitter_type == SplitterType.SEMANTIC:
-            return SemanticSplitterWithEmbedding(
-                embedding_model=embedding_model,
-                **kwargs
-            )
-        else:
-            raise ValueError(f"Unknown splitter type: {splitter_type}")
+        try:
+            builder = _SPLITTER_BUILDERS[splitter_type]
+        except (KeyError, TypeError):
+            raise ValueError(f"Unknown splitter type: {splitter_type}") from None
+        return builder(embedding_model, **kwargs)
@@ -1,6 +1,8 @@
 from dataclasses import dataclass
 from enum import Enum
 
+from .constants import LENGTH_UNIT_CHARS
+
 # from .constants import DEFAULT_EMBEDDING_MODEL
 
 class SplitStrategy(Enum):
@@ -20,10 +22,14 @@ class SplitParameter:
     overlap: int = 0
     separator: str | None = None
     model_name: str | None = None  # For semantic splitting
+    length_unit: str = LENGTH_UNIT_CHARS  # LENGTH_UNIT_CHARS or LENGTH_UNIT_TOKENS; tokens apply to semantic merging
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SplitResult:
-    """Results from document splitting operation."""
+    """Results from document splitting operation.
+
+    Immutable and slotted: results are created once per split and only read afterwards.
+    """
 
     segments: list[str]
     metadata: dict
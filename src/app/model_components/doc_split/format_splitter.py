@@ -1,10 +1,16 @@
 
+import os
 import re
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
 from typing import Any
 
 from .base import DocSplitBase
 from .dto import SplitParameter, SplitResult, SplitStrategy
 
+# Header lines captured as their own chunks by re.split
+_HEADER_SPLIT_RE = re.compile(r'\n(#{1,6}\s[^\n]*\n)')
+
 
 class FormatSplitter(DocSplitBase):
     """Format-based document splitter that splits text based on formatting rules."""
@@ -23,73 +29,46 @@ class FormatSplitter(DocSplitBase):
         text = text.replace('\r\n', '\n')
         return f"\n{text.strip()}\n"
 
-    def _create_split_pattern(self, separator: str = None) -> str:
-        """Create regex pattern for splitting text.
-        
-        Args:
-            separator: Optional additional separator
-            
-        Returns:
-            Regex pattern string
-
-        """
-        # Define common markdown separators
-        patterns = [
-            r'\n#{1,6}\s[^\n]*\n',  # Headers
-            r'\n\*\*\*\n',          # Horizontal rules
-            r'\n---\n',             # Alternative horizontal rules
-            r'\n\n+',               # Multiple newlines (paragraphs)
-        ]
-        
-        if separator:
-            patterns.append(re.escape(separator))
-            
-        return '|'.join(patterns)
-
-    def _split_by_format(self, text: str, pattern: str) -> list[str]:
+    def _split_by_format(self, text: str) -> Iterator[str]:
         """Split text by formatting patterns.
         
+        Segments are yielded unstripped; callers strip and drop blank ones
+        (see ``DocSplitBase._normalize_and_split``).
+        
         Args:
             text: Text to split
-            pattern: Regex pattern for splitting
             
-        Returns:
-            List of text segments
+        Yields:
+            Raw text segments
 
         """
-        # First split by headers
-        header_pattern = r'\n(#{1,6}\s[^\n]*\n)'
-        segments = []
         current_segment = ""
         
         # Split text into chunks by headers first
-        for chunk in re.split(header_pattern, text):
+        for chunk in _HEADER_SPLIT_RE.split(text):
             if chunk:  # Handle None or empty strings
-                if chunk.strip().startswith('#'):
+                if chunk.lstrip().startswith('#'):
                     # If we have accumulated content, add it
-                    if current_segment.strip():
-                        segments.append(current_segment.strip())
+                    if current_segment:
+                        yield current_segment
                     current_segment = chunk
                 else:
-                    # Split non-header content by paragraphs
-                    paragraphs = [p for p in chunk.split('\n\n') if p.strip()]
+                    # Split non-header content by paragraphs, isspace() avoids a strip() copy
+                    paragraphs = [p for p in chunk.split('\n\n') if p and not p.isspace()]
                     if current_segment:
                         # Add first paragraph to current segment if exists
                         if paragraphs:
-                            current_segment += '\n' + paragraphs[0]
-                            segments.append(current_segment.strip())
+                            yield current_segment + '\n' + paragraphs[0]
                             paragraphs = paragraphs[1:]
                         else:
-                            segments.append(current_segment.strip())
+                            yield current_segment
                     # Add remaining paragraphs
-                    segments.extend([p.strip() for p in paragraphs if p.strip()])
+                    yield from paragraphs
                     current_segment = ""
         
         # Add any remaining content
-        if current_segment.strip():
-            segments.append(current_segment.strip())
-            
-        return [seg for seg in segments if seg]  # Remove any empty segments
+        if current_segment:
+            yield current_segment
 
     def split(self, parameter: SplitParameter) -> SplitResult:
         """Split text based on formatting rules.
@@ -101,40 +80,50 @@ class FormatSplitter(DocSplitBase):
             SplitResult containing the split segments
 
         """
-        text = self._preprocess_text(parameter.text)
-        pattern = self._create_split_pattern(parameter.separator)
-        
-        # Get initial segments
-        segments = self._split_by_format(text, pattern)
+        # Get initial segments, preprocessing and stripping fused into one pass
+        segments = self._normalize_and_split(
+            parameter.text,
+            self._split_by_format
+        )
         
-        # Apply length constraints
+        # Apply length constraints; pieces are buffered and joined only on flush.
+        # Segments are stripped and joined by single spaces, so the running length
+        # is exact and chunks below min_length are dropped without being built.
         final_segments = []
-        current_segment = ""
+        current_parts: list[str] = []
+        current_len = 0
+        max_length = parameter.max_length
+        min_length = parameter.min_length
         
         for segment in segments:
+            segment_len = len(segment)
             # If adding this segment would exceed max_length
-            if len(current_segment) + len(segment) + 1 <= parameter.max_length:
-                current_segment += (" " + segment if current_segment else segment)
+            if current_len + segment_len + 1 <= max_length:
+                # Each extra piece costs one more char for the joining space
+                current_len += segment_len + 1 if current_parts else segment_len
+                current_parts.append(segment)
             else:
                 # Add current segment if it meets minimum length
-                if current_segment and len(current_segment) >= parameter.min_length:
-                    final_segments.append(current_segment.strip())
+                if current_parts and current_len >= min_length:
+                    final_segments.append(" ".join(current_parts))
                 # Start new segment
-                current_segment = segment
+                current_parts = [segment]
+                current_len = segment_len
         
         # Add last segment if it meets minimum length
-        if current_segment and len(current_segment) >= parameter.min_length:
-            final_segments.append(current_segment.strip())
+        if current_parts and current_len >= min_length:
+            final_segments.append(" ".join(current_parts))
         
         # Ensure we have at least one segment even if it's shorter than min_length
         if not final_segments and segments:
-            final_segments = [segments[0].strip()]
+            final_segments = [segments[0]]
         
-        # Create metadata
+        # Segments are already stripped, so one scan answers both metadata fields
+        has_headers = any(s.startswith('#') for s in segments)
         metadata = {
             "total_segments": len(final_segments),
-            "format": "markdown" if any(s.startswith('#') for s in segments) else "plain",
-            "has_headers": any(s.strip().startswith('#') for s in segments)
+            "format": "markdown" if has_headers else "plain",
+            "has_headers": has_headers
         }
         
         return SplitResult(
@@ -143,6 +132,30 @@ class FormatSplitter(DocSplitBase):
             strategy=SplitStrategy.FORMAT
         )
 
+    def split_many(self, parameters: list[SplitParameter],
+                   max_workers: int | None = None) -> list[SplitResult]:
+        """Split several independent documents in worker processes.
+        
+        Format splitting is pure-Python string work that holds the GIL, so the
+        documents are spread over processes rather than threads.
+        
+        Args:
+            parameters: One SplitParameter per document
+            max_workers: Process pool size, defaults to min(cpu count, number of documents)
+            
+        Returns:
+            List[SplitResult]: Results in the same order as ``parameters``
+
+        """
+        if len(parameters) <= 1:
+            return [self.split(parameter) for parameter in parameters]
+
+        workers = max_workers or min(os.cpu_count() or 1, len(parameters))
+        # Batch small documents so pickling round-trips do not dominate
+        chunksize = max(1, len(parameters) // (8 * workers))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self.split, parameters, chunksize=chunksize))
+
     def __call__(self, *args: Any, **kwds: Any) -> Any:
         """Split the input text using default or overridden parameters.
 
@@ -1,17 +1,61 @@
+import logging
+from functools import lru_cache
 from typing import Any
 
 from src.app.model_components.model.embedding import (
     EmbedParameter,
     OpenAiStyleEmbeddings,
 )
+from src.utils.cache_util import LRUCache, digest_key
+from src.utils.logger import logger
 
 # from ..base_component import BaseComponent
 from .base import DocSplitBase
-from .constants import DEFAULT_EMBEDDING_MODEL, DEFAULT_SIMILARITY_THRESHOLD
+from .constants import (
+    DEFAULT_EMBEDDING_MODEL,
+    DEFAULT_SIMILARITY_THRESHOLD,
+    DEFAULT_TOKEN_ENCODING,
+    EMBEDDING_CACHE_SIZE,
+    LENGTH_UNIT_CHARS,
+    LENGTH_UNIT_TOKENS,
+    SENTENCE_END_RE,
+)
 from .dto import SplitParameter, SplitResult, SplitStrategy
 from .format_splitter import FormatSplitter
 
 
+@lru_cache(maxsize=1)
+def _token_encoding() -> Any:
+    """Load the tiktoken encoding once; tiktoken is only needed for token lengths."""
+    try:
+        import tiktoken
+    except ImportError as e:
+        raise ImportError("length_unit='tokens' requires the tiktoken package") from e
+    return tiktoken.get_encoding(DEFAULT_TOKEN_ENCODING)
+
+
+def _segment_lengths(segments: list[str], length_unit: str) -> list[int]:
+    """Measure segments in characters or tokens.
+    
+    Args:
+        segments: Text segments to measure
+        length_unit: LENGTH_UNIT_CHARS or LENGTH_UNIT_TOKENS
+        
+    Returns:
+        List[int]: Length of each segment in the requested unit
+        
+    Raises:
+        ValueError: If length_unit is not recognized
+
+    """
+    if length_unit == LENGTH_UNIT_CHARS:
+        return [len(seg) for seg in segments]
+    if length_unit == LENGTH_UNIT_TOKENS:
+        # One batched call encodes all segments instead of one call per segment
+        return [len(tokens) for tokens in _token_encoding().encode_ordinary_batch(segments)]
+    raise ValueError(f"Unknown length unit: {length_unit}")
+
+
 class SemanticSplitterWithEmbedding(DocSplitBase):
     """A semantic document splitter that uses embeddings to perform intelligent text segmentation.
     
@@ -20,20 +64,75 @@ class SemanticSplitterWithEmbedding(DocSplitBase):
     """
 
     def __init__(self, embedding_model: OpenAiStyleEmbeddings | None = None,
-                 similarity_threshold: float = DEFAULT_SIMILARITY_THRESHOLD) -> None:
+                 similarity_threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+                 quantize_cache: bool = False) -> None:
         """Initialize the semantic splitter with embedding capabilities.
         
         Args:
             embedding_model: An instance of OpenAiStyleEmbeddings for computing text embeddings
             similarity_threshold: Threshold for determining semantic similarity (default: 0.7)
+            quantize_cache: Store cached embeddings as int8, a quarter of the float32 size,
+                at the cost of a small cosine error on cache hits
 
         """
         super().__init__()
         self.embedding_model = embedding_model
         self.similarity_threshold = similarity_threshold
-        self._punctuation_pattern = r'([.!?])\s+'
+        self._punctuation_pattern = SENTENCE_END_RE
         self.format_splitter = FormatSplitter()  
+        # Boilerplate such as headers and footers repeats across documents
+        self._embedding_cache = LRUCache(maxsize=EMBEDDING_CACHE_SIZE)
+        self.quantize_cache = quantize_cache
                 
+    def _embed(self, texts: list[str]) -> Any:
+        """Embed several texts, sending only cache misses in a single API call.
+        
+        Args:
+            texts: Text segments to embed
+            
+        Returns:
+            numpy.ndarray: L2-normalized float32 matrix of shape (len(texts), dim),
+                rows in input order, so a dot product is the cosine similarity
+
+        """
+        import numpy as np
+
+        keys = [digest_key(DEFAULT_EMBEDDING_MODEL, text) for text in texts]
+        rows = [self._embedding_cache.get(key) for key in keys]
+        # Deduplicate misses so a text repeated within the batch is embedded once
+        missing = {key: text for key, text, row in zip(keys, texts, rows) if row is None}
+
+        if missing:
+            # Fields are built here and already valid, so skip pydantic validation.
+            # Vectors are cached here (optionally as int8), so bypass the embedding client's cache
+            data = self.embedding_model.create(EmbedParameter.model_construct(
+                query=list(missing.values()),
+                model=DEFAULT_EMBEDDING_MODEL,
+                use_cache=False
+            ))
+            # OpenAI-style responses carry an index per item; do not rely on ordering
+            if data and "index" in data[0]:
+                data = sorted(data, key=lambda item: item["index"])
+            fetched = np.asarray([item["embedding"] for item in data], dtype=np.float32)
+            fetched /= np.linalg.norm(fetched, axis=1, keepdims=True)
+            fetched_by_key = dict(zip(missing, fetched))
+            for key, row in fetched_by_key.items():
+                self._embedding_cache.put(key, self._quantize(row) if self.quantize_cache else row)
+            rows = [fetched_by_key[key] if row is None else row for key, row in zip(keys, rows)]
+
+        vectors = np.stack(rows).astype(np.float32, copy=False)
+        if self.quantize_cache:
+            # Cached rows are unscaled int8; cosine ignores scale, so renormalizing restores them
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors
+
+    @staticmethod
+    def _quantize(row: Any) -> Any:
+        """Quantize a normalized embedding row to int8 over the full [-127, 127] range."""
+        import numpy as np
+
+        return np.rint(row * (127.0 / np.abs(row).max())).astype(np.int8)
+
     def _compute_embedding_similarity(self, text1: str, text2: str) -> float:
         """Compute the cosine similarity between two text segments using embeddings.
         
@@ -45,49 +144,35 @@ class SemanticSplitterWithEmbedding(DocSplitBase):
             float: Similarity score between 0 and 1
 
         """
-        print("\nComputing similarity with real API...")
-        print(f"Text 1: {text1[:50]}...")
-        print(f"Text 2: {text2[:50]}...")
-        
         if not self.embedding_model:
-            print("Warning: No embedding model available")
+            logger.warning("No embedding model available")
             return 0.0
             
         try:
-            print("Getting embeddings from API...")
-            emb1 = self.embedding_model.create(EmbedParameter(
-                query=text1,
-                model=DEFAULT_EMBEDDING_MODEL
-            ))
-            print("First embedding completed")
-            
-            emb2 = self.embedding_model.create(EmbedParameter(
-                query=text2,
-                model=DEFAULT_EMBEDDING_MODEL
-            ))
-            print("Second embedding completed")
-            
-            # 计算相似度
-            import numpy as np
-            vec1 = np.array(emb1[0]['embedding'])
-            vec2 = np.array(emb2[0]['embedding'])
-            similarity = np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2))
-            
-            print(f"Computed similarity: {similarity}")
-            print(f"current: {text1} and self.next_seg: {text2}")
-            print(f"similarity:{similarity}")
-            return float(similarity)
+            vec1, vec2 = self._embed([text1, text2])
+            similarity = float(vec1 @ vec2)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("similarity %.4f between %r and %r", similarity, text1[:50], text2[:50])
+            return similarity
             
         except Exception as e:
-            print(f"Error computing similarity: {str(e)}")
+            logger.error("Error computing similarity: %s", e)
             raise
         
-    def _merge_similar_segments(self, segments: list[str], max_length: int) -> list[str]:
+    def _merge_similar_segments(self, segments: list[str], max_length: int, min_length: int = 0,
+                                lengths: list[int] | None = None) -> list[str]:
         """Merge segments that are semantically similar while respecting max length.
         
+        Segments that could fit together with a neighbour are embedded up front in
+        one batched request and their adjacent similarities come from a single
+        vectorized pass; only a merged group needs a fresh embedding afterwards.
+        Groups are tracked as index bounds and joined once at the end.
+        
         Args:
             segments: List of text segments to potentially merge
             max_length: Maximum length allowed for merged segments
+            min_length: Merged segments shorter than this are dropped
+            lengths: Precomputed segment lengths in the budget's unit, characters if omitted
             
         Returns:
             List[str]: Merged segments
@@ -96,37 +181,65 @@ class SemanticSplitterWithEmbedding(DocSplitBase):
         if not segments:
             return segments
 
-        merged = []
-        current = segments[0]
+        if lengths is None:
+            lengths = [len(seg) for seg in segments]
 
-        for next_seg in segments[1:]:
-            combined_length = len(current) + len(next_seg) + 1  # +1 for space
-            
-            print("\nConsidering merge:")
-            print(f"Current segment ({len(current)} chars): {current[:50]}...")
-            print(f"Next segment ({len(next_seg)} chars): {next_seg[:50]}...")
-            print(f"Combined length would be: {combined_length}")
-            print(f"Max length allowed: {max_length}")
+        # A pair that exceeds max_length on its own can never be compared, since a
+        # group is at least as long as its last segment. Only segments in a fitting
+        # pair need an embedding.
+        fitting = [i for i in range(1, len(segments)) if lengths[i - 1] + lengths[i] + 1 <= max_length]
+        if fitting:
+            import numpy as np
+
+            needed = sorted({j for i in fitting for j in (i - 1, i)})
+            row_of = {j: row for row, j in enumerate(needed)}
+            vectors = self._embed([segments[j] for j in needed])
+            left = [row_of[i - 1] for i in fitting]
+            right = [row_of[i] for i in fitting]
+            adjacent_sims = dict(zip(fitting, np.einsum('ij,ij->i', vectors[left], vectors[right]).tolist()))
+
+        debug = logger.isEnabledFor(logging.DEBUG)
+        bounds: list[tuple[int, int, int]] = []
+        # Current group is segments[start:i]; its joined length is tracked without building it
+        start = 0
+        current_len = lengths[0]
+        # Embedding of the current group once it spans several segments, None otherwise
+        merged_vec = None
+
+        for i in range(1, len(segments)):
+            next_len = lengths[i]
+            combined_length = current_len + next_len + 1  # +1 for the joining newline
+            if debug:
+                logger.debug(
+                    "Considering merge: current (%d chars) %r, next (%d chars) %r, combined %d / max %d",
+                    current_len, segments[start][:50], next_len, segments[i][:50], combined_length, max_length
+                )
 
             if combined_length <= max_length:
-                similarity = self._compute_embedding_similarity(current, next_seg)
-                print(f"Computed similarity: {similarity}")
-                print(f"Threshold: {self.similarity_threshold}")
+                if i - start == 1:
+                    similarity = adjacent_sims[i]
+                else:
+                    if merged_vec is None:
+                        # The group grew through a merge, embed its joined text once
+                        merged_vec = self._embed(["\n".join(segments[start:i])])[0]
+                    similarity = float(merged_vec @ vectors[row_of[i]])
+                if debug:
+                    logger.debug("similarity %.4f, threshold %s", similarity, self.similarity_threshold)
 
                 if similarity >= self.similarity_threshold:
-                    print("Merging segments due to high similarity")
-                    current = f"{current}\n{next_seg}"
+                    current_len = combined_length
+                    merged_vec = None
                     continue
-                else:
-                    print("Not merging due to low similarity")
-            else:
-                print("Not merging due to length constraint")
+            elif debug:
+                logger.debug("Not merging due to length constraint")
 
-            merged.append(current)
-            current = next_seg
+            bounds.append((start, i, current_len))
+            start = i
+            current_len = next_len
+            merged_vec = None
 
-        merged.append(current)
-        return merged
+        bounds.append((start, len(segments), current_len))
+        return ["\n".join(segments[lo:hi]) for lo, hi, length in bounds if length >= min_length]
     
     def split(self, parameter: SplitParameter) -> SplitResult:
         """Split text using semantic embeddings for intelligent segmentation.
@@ -146,20 +259,24 @@ class SemanticSplitterWithEmbedding(DocSplitBase):
             format_result = self.format_splitter.split(parameter)
             initial_segments = format_result.segments
 
+        # 长度预算可以按字符或 token 计算，每个段落只测量一次
+        lengths = _segment_lengths(initial_segments, parameter.length_unit)
+
         # 使用 embedding 模型合并相似段落
         if self.embedding_model:
+            # 过短的段落在合并的最后一步直接丢弃
             final_segments = self._merge_similar_segments(
                 initial_segments,
-                parameter.max_length
+                parameter.max_length,
+                parameter.min_length,
+                lengths
             )
         else:
-            final_segments = initial_segments
-
-        # 过滤太短的段落
-        final_segments = [
-            seg for seg in final_segments 
-            if len(seg) >= parameter.min_length
-        ]
+            # 过滤太短的段落
+            final_segments = [
+                seg for seg, length in zip(initial_segments, lengths)
+                if length >= parameter.min_length
+            ]
 
         metadata = {
             "total_segments": len(final_segments),
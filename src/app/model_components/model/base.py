@@ -1,38 +1,170 @@
-import json
+import asyncio
 import os
-import traceback
+import time
+import weakref
 from abc import ABC, abstractmethod
-from collections.abc import AsyncGenerator, Iterator
+from collections.abc import AsyncGenerator, AsyncIterable, Iterable, Iterator
+from functools import cached_property
 from typing import Any
 
 import httpx
 
+from src.utils import http_util, json_util, retry_util
+from src.utils.cache_util import LRUCache, digest_key
 from src.utils.logger import logger
 
 from ..base_component import BaseComponent
 from .constants import (
     DEFAULT_COMPLETION_PATH,
     DEFAULT_EMBEDDING_PATH,
+    DEFAULT_MAX_CONCURRENCY,
 )
 from .dto import (
+    MESSAGE_LIST_ADAPTER,
+    AIMessage,
     BaseCompletionParameter,
     BaseLLMParameter,
+    CompletionsChoice,
     ModelResponse,
 )
 from .embedding import OpenAiStyleEmbeddings
 
+# 进程内共享的补全结果缓存，仅缓存温度为 0 的非流式请求
+_completion_cache = LRUCache(maxsize=10_000)
+
+# SSE 结束标记，以及不携带数据、需要跳过的字段行
+_SSE_DONE = b"[DONE]"
+_SSE_SKIPPED_FIELDS = (b":", b"event:", b"id:", b"retry:")
+
+
+def _iter_lines(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """把任意切分的字节块重新按换行切分成完整的行。
+
+    未完整的行留在缓冲区里，只扫描新到达的字节，长行跨越多个块时也不会重复拷贝和查找。
+    """
+    buffer = bytearray()
+    for chunk in chunks:
+        scan_from = len(buffer)
+        buffer += chunk
+        start = 0
+        while (end := buffer.find(b"\n", scan_from)) != -1:
+            yield bytes(buffer[start:end])
+            start = scan_from = end + 1
+        del buffer[:start]
+    if buffer:
+        yield bytes(buffer)
+
+
+async def _aiter_lines(chunks: AsyncIterable[bytes]) -> AsyncGenerator[bytes, None]:
+    """_iter_lines 的异步版本。"""
+    buffer = bytearray()
+    async for chunk in chunks:
+        scan_from = len(buffer)
+        buffer += chunk
+        start = 0
+        while (end := buffer.find(b"\n", scan_from)) != -1:
+            yield bytes(buffer[start:end])
+            start = scan_from = end + 1
+        del buffer[:start]
+    if buffer:
+        yield bytes(buffer)
+
+
+def _sse_payload(line: bytes) -> bytes | None:
+    """取出一行流式响应中的 JSON 负载。
+
+    只去掉行首的 ``data:`` 前缀，负载内部出现的同名字符串保持不变；
+    没有前缀的行按 NDJSON 处理。
+
+    Args:
+        line (bytes): 一行原始响应。
+
+    Returns:
+        bytes | None: JSON 负载，空行、注释和非 data 字段返回 None。
+
+    """
+    line = line.strip()
+    if not line or line.startswith(_SSE_SKIPPED_FIELDS):
+        return None
+    if line.startswith(b"data:"):
+        return line[5:].lstrip()
+    return line
+
+
+def _construct_stream_chunk(data: dict[str, Any]) -> ModelResponse:
+    """跳过 Pydantic 校验构造流式响应块。
+
+    流式输出每个 token 都会产生一个响应块，数据由模型服务生成并已完成 JSON 解析，
+    逐块完整校验的开销在长输出时很明显。model_construct 不会递归构造嵌套模型，
+    因此 choices 及其中的 message/delta 需要手动构造。
+
+    Args:
+        data (dict[str, Any]): 解析后的响应块。
+
+    Returns:
+        ModelResponse: 响应对象。
+
+    """
+    choices = []
+    for choice in data.get("choices") or ():
+        for key in ("message", "delta"):
+            message = choice.get(key)
+            if message is not None:
+                choice[key] = AIMessage.model_construct(**message)
+        choices.append(CompletionsChoice.model_construct(**choice))
+    data["choices"] = choices
+    return ModelResponse.model_construct(**data)
+
+
+def _build_request_json(parameter: BaseCompletionParameter) -> dict[str, Any]:
+    """构造补全接口的请求体。
+
+    Args:
+        parameter (BaseCompletionParameter): 补全参数。
+
+    Returns:
+        dict[str, Any]: 请求体字典。
+
+    """
+    return {
+        "messages":MESSAGE_LIST_ADAPTER.dump_python(parameter.messages),
+        "temperature":parameter.temperature,
+        "stream":parameter.stream,
+        "max_new_tokens":parameter.max_new_tokens,
+        "model":parameter.model
+    }
+
+
+class _BaseCompletions:
+    """Completions 与 AsyncCompletions 共用的请求构造和非流式响应处理。"""
 
-class Completions:
     suffix = DEFAULT_COMPLETION_PATH
+    # 属性只在构造时写入、每次请求都会读取，使用 __slots__ 省去实例 __dict__
+    __slots__ = (
+        "api_key", "base_url", "full_url", "max_retry", "_completion_url", "_headers", "_stream_headers", "rate_limiter",
+    )
 
     def __init__(self, api_key: str = None,
                         base_url: str = None,
                         full_url: str = None,
-                        max_retry: int = 3) -> None:
+                        max_retry: int = 3,
+                        rate_limiter: retry_util.TokenBucket | None = None,
+                        compress: bool = True) -> None:
         self.api_key = api_key
         self.base_url = base_url
         self.full_url = full_url
         self.max_retry = max_retry
+        # URL 与请求头在实例生命周期内不变，构造时计算一次，所有请求和重试直接复用
+        self._completion_url = full_url or (base_url + DEFAULT_COMPLETION_PATH if base_url else None)
+        self._headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+        # httpx 默认按已安装的解码器协商 gzip/deflate（以及 br、zstd），流式 JSON 重复度高，压缩收益明显；
+        # 个别 SSE 代理在压缩时会缓冲整段响应，此时可以通过 compress=False 关闭
+        if not compress:
+            self._headers["Accept-Encoding"] = "identity"
+        # 声明期望事件流，避免中间代理把流式响应当作普通响应缓冲
+        self._stream_headers = {**self._headers, "Accept": "text/event-stream"}
+        # 可选的令牌桶，每次发起请求（包括重试）前先取令牌，避免突发请求触发服务端限流
+        self.rate_limiter = rate_limiter
 
     @property
     def completion_url(self) -> str:
@@ -42,62 +174,240 @@ class Completions:
             str: 完整的 URL。
 
         """
-        if self.full_url:
-            return self.full_url
-        return self.base_url + DEFAULT_COMPLETION_PATH
+        return self._completion_url
+
+    def _prepare_request(self, parameter: BaseCompletionParameter) -> tuple[bytes, bytes | None]:
+        """构造并序列化请求体，并为可缓存的请求计算缓存键。
+
+        请求体只序列化一次，所有重试都直接复用这份字节。
+        温度为 0 的非流式结果是确定的，相同请求可以直接命中缓存，不再访问模型服务。
+        缓存键包含认证头，凭证不同的请求不会互相命中；digest_key 只保存摘要，不保留明文凭证。
+
+        Args:
+            parameter (BaseCompletionParameter): 补全参数。
+
+        Returns:
+            tuple[bytes, bytes | None]: JSON 请求体和缓存键，不可缓存时缓存键为 None。
+
+        """
+        body = json_util.dumps(_build_request_json(parameter))
+        cache_key = None
+        if not parameter.stream and parameter.temperature == 0:
+            cache_key = digest_key(self._completion_url, self._headers["Authorization"], body)
+        return body, cache_key
+
+    def _handle_non_stream_response(self, data: dict[str, Any], cache_key: bytes | None) -> ModelResponse:
+        """校验非流式响应并转换为 ModelResponse，需要时写入缓存。
+
+        Args:
+            data (dict[str, Any]): 接口返回的 JSON 数据。
+            cache_key (bytes | None): 缓存键。
+
+        Returns:
+            ModelResponse: 响应对象。
+
+        Raises:
+            ValueError: 响应中没有 choices 时抛出。
+
+        """
+        if not data.get("choices") or len(data["choices"]) == 0:
+            raise ValueError(f"Invalid API response: {data}")
+
+        result = ModelResponse(**data)  # 将响应数据映射到模型
+        if cache_key is not None:
+            _completion_cache.put(cache_key, result.model_copy(deep=True))
+        return result
+
+
+class Completions(_BaseCompletions):
+    __slots__ = ()
+
+    def _handle_stream_response(self, response: httpx.Response) -> Iterator[ModelResponse]:
+        """逐块解析流式响应。
+
+        Args:
+            response (httpx.Response): 以 stream 方式打开的响应。
+
+        Yields:
+            ModelResponse: 每个数据块对应的响应对象，遇到 [DONE] 结束。
+
+        """
+        for line in _iter_lines(response.iter_bytes()):
+            payload = _sse_payload(line)
+            if payload is None:
+                continue
+            if payload == _SSE_DONE:
+                return
+            yield _construct_stream_chunk(json_util.loads(payload))
     
     def create(self, parameter: BaseCompletionParameter) -> Iterator[ModelResponse]:
+         body, cache_key = self._prepare_request(parameter)
+         if cache_key is not None:
+             cached = _completion_cache.get(cache_key)
+             if cached is not None:
+                 yield cached.model_copy(deep=True)
+                 return
+
          count = 0
-         with httpx.Client(timeout=30) as client:
-            while count < self.max_retry:
+         # 所有实例共享同一个连接池，重试和后续请求都复用已建立的连接
+         client = http_util.get_client()
+         url, headers, stream_headers = self._completion_url, self._headers, self._stream_headers
+         max_retry, rate_limiter = self.max_retry, self.rate_limiter
+         # 流式输出一旦开始就不能重试，否则调用方会重复收到已产出的内容
+         started = False
+         while count < max_retry:
+             if rate_limiter is not None:
+                 rate_limiter.acquire()
+             try:
+                 if not parameter.stream:
+                     # 如果不使用流式返回
+                     response = client.post(url, content=body, headers=headers)
+                     response.raise_for_status()
+                     yield self._handle_non_stream_response(json_util.loads(response.content), cache_key)
+                     return
+                 # 使用流式返回，边接收边解析
+                 with client.stream("POST", url, content=body, headers=stream_headers) as response:
+                     response.raise_for_status()
+                     for result in self._handle_stream_response(response):
+                         started = True
+                         yield result
+                 return
+             except Exception as e:
+                 if started or not retry_util.is_retryable(e):
+                     logger.exception("completions接口出错")
+                     raise
+                 count = count+1
+                 if count < max_retry:
+                     # 中间的失败只记录异常摘要，重试用尽时才输出完整堆栈
+                     logger.warning("completions接口出错：%r（第%d次）", e, count)
+                     time.sleep(retry_util.backoff_delay(count, e))
+                 else:
+                     # 重试用尽时抛出最后一次的异常，与非重试类错误的行为一致
+                     logger.exception("completions接口出错，已重试%d次", count)
+                     raise
+
+
+class AsyncCompletions(_BaseCompletions):
+    """Completions 的异步版本。
+
+    基于当前事件循环共享的 httpx.AsyncClient，多个请求可以在同一个事件循环里通过
+    asyncio.gather 并发执行，同时在途的请求数由信号量限制。
+    """
+
+    __slots__ = ("max_concurrency", "_semaphores")
+
+    def __init__(self, api_key: str = None,
+                        base_url: str = None,
+                        full_url: str = None,
+                        max_retry: int = 3,
+                        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                        rate_limiter: retry_util.TokenBucket | None = None,
+                        compress: bool = True) -> None:
+        super().__init__(api_key=api_key, base_url=base_url, full_url=full_url, max_retry=max_retry,
+                         rate_limiter=rate_limiter, compress=compress)
+        self.max_concurrency = max_concurrency
+        # 信号量绑定在首次使用它的事件循环上，与 http_util 的 AsyncClient 一样按事件循环各自创建，
+        # 同一实例可以在多次 asyncio.run 中使用
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """获取当前事件循环对应的并发信号量，必须在协程中调用。
+
+        Returns:
+            asyncio.Semaphore: 限制同时在途请求数的信号量。
+
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def _handle_stream_response(self, response: httpx.Response) -> AsyncGenerator[ModelResponse, None]:
+        """逐块解析流式响应，解析规则与 Completions._handle_stream_response 一致。
+
+        Args:
+            response (httpx.Response): 以 stream 方式打开的响应。
+
+        Yields:
+            ModelResponse: 每个数据块对应的响应对象，遇到 [DONE] 结束。
+
+        """
+        async for line in _aiter_lines(response.aiter_bytes()):
+            payload = _sse_payload(line)
+            if payload is None:
+                continue
+            if payload == _SSE_DONE:
+                return
+            yield _construct_stream_chunk(json_util.loads(payload))
+
+    async def create(self, parameter: BaseCompletionParameter) -> AsyncGenerator[ModelResponse, None]:
+        """异步调用补全接口，语义与 Completions.create 一致。
+
+        Args:
+            parameter (BaseCompletionParameter): 补全参数。
+
+        Yields:
+            ModelResponse: 非流式时产出一个完整响应，流式时逐块产出。
+
+        """
+        body, cache_key = self._prepare_request(parameter)
+        if cache_key is not None:
+            cached = _completion_cache.get(cache_key)
+            if cached is not None:
+                yield cached.model_copy(deep=True)
+                return
+
+        client = http_util.get_async_client()
+        url, headers, stream_headers = self._completion_url, self._headers, self._stream_headers
+        max_retry, rate_limiter = self.max_retry, self.rate_limiter
+        async with self._get_semaphore():
+            count = 0
+            started = False
+            while count < max_retry:
+                if rate_limiter is not None:
+                    await rate_limiter.aacquire()
                 try:
-                    response = client.post(
-                        self.completion_url,
-                        json={
-                            "messages":[message.model_dump() for message in parameter.messages],
-                            "temperature":parameter.temperature,
-                            "stream":parameter.stream,
-                            "max_new_tokens":parameter.max_new_tokens,
-                            "model":parameter.model
-                        },
-                        headers={"Authorization": f"Bearer {self.api_key}"},
-                    )
-                    response.raise_for_status()
-
-                    # data = response.json()  # 获取响应的 JSON 数据
                     if not parameter.stream:
-                        # 如果不使用流式返回
-                        data = response.json()  # 获取响应的 JSON 数据
-
-                        if not data.get("choices") or len(data["choices"]) == 0:
-                            raise ValueError(f"Invalid API response: {data}")
-
-                        result = ModelResponse(**data)  # 将响应数据映射到模型
-
-                        # yield result.choices[0].message.content
-                        yield result
-                    # 使用流式返回
-                    for line in response.iter_lines():
-                        if line:
-                            if "DONE" in line:
-                                return
-                            # 去掉 'data:' 前缀并解析 JSON 数据
-                            data = json.loads(line.replace("data:", ""))
-                            result = ModelResponse(**data)
+                        response = await client.post(url, content=body, headers=headers)
+                        response.raise_for_status()
+                        yield self._handle_non_stream_response(json_util.loads(response.content), cache_key)
+                        return
+
+                    async with client.stream(
+                        "POST", url, content=body, headers=stream_headers
+                    ) as response:
+                        response.raise_for_status()
+                        async for result in self._handle_stream_response(response):
+                            started = True
                             yield result
-                except Exception:
-                    logger.error(f"completions接口出错：{traceback.format_exc()}")
+                    return
+                except Exception as e:
+                    if started or not retry_util.is_retryable(e):
+                        logger.exception("completions接口出错")
+                        raise
                     count = count+1
-            # 如果不使用流式返回
-            
-            # result = MixResponse(**data)  # 将响应数据映射到模型
-            # yield result.choices[0].message.content
+                    if count < max_retry:
+                        logger.warning("completions接口出错：%r（第%d次）", e, count)
+                        await asyncio.sleep(retry_util.backoff_delay(count, e))
+                    else:
+                        logger.exception("completions接口出错，已重试%d次", count)
+                        raise
+
 
 class AbsLLMModel(ABC, BaseComponent):
     api_key: str = None
     base_url: str = None
     full_url: str = None
     max_retry: int = 3
+    # 以下三项由 BaseLLMParameter 的 rate_limit/compress/max_concurrency 在构造时设置
+    # 同一模型实例的所有补全请求共享该限流器
+    rate_limiter: retry_util.TokenBucket | None = None
+    compress: bool = True
+    # batch_generate 的并发数也不会超过它
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY
 
     def __init__(self, parameter: BaseLLMParameter) -> None:
         # if isinstance(parameter, dict):
@@ -109,14 +419,19 @@ class AbsLLMModel(ABC, BaseComponent):
         self.base_url = parameter.base_url
         self.full_url = parameter.full_url
         self.max_retry = parameter.max_retry
+        if parameter.rate_limit:
+            self.rate_limiter = retry_util.TokenBucket(parameter.rate_limit)
+        self.compress = parameter.compress
+        self.max_concurrency = parameter.max_concurrency
 
-    @property
+    # 子类会在 super().__init__ 之后再设置 base_url/full_url，因此在首次访问时计算并缓存
+    @cached_property
     def completion_url(self) -> str:
         if self.full_url:
             return self.full_url
         return self.base_url + DEFAULT_COMPLETION_PATH
     
-    @property
+    @cached_property
     def embed_url(self) -> str:
         if self.full_url:
             return self.full_url
@@ -126,11 +441,21 @@ class AbsLLMModel(ABC, BaseComponent):
     def chat(self) -> "AbsLLMModel":
         return self
     
-    @property
+    # 客户端对象按模型实例只创建一次，后续访问直接复用
+    @cached_property
     def completions(self) -> Completions:
-        return Completions(api_key=self.api_key, base_url=self.base_url, full_url=self.full_url, max_retry=self.max_retry)
+        return Completions(api_key=self.api_key, base_url=self.base_url, full_url=self.full_url, max_retry=self.max_retry,
+                           rate_limiter=self.rate_limiter, compress=self.compress)
     
-    @property
+    @cached_property
+    def async_completions(self) -> AsyncCompletions:
+        # 信号量需要在多次调用间共享才能限制并发
+        return AsyncCompletions(
+            api_key=self.api_key, base_url=self.base_url, full_url=self.full_url, max_retry=self.max_retry,
+            max_concurrency=self.max_concurrency, rate_limiter=self.rate_limiter, compress=self.compress,
+        )
+
+    @cached_property
     def embeddings(self) -> OpenAiStyleEmbeddings:
         return OpenAiStyleEmbeddings(
             BaseLLMParameter(
@@ -167,6 +492,31 @@ class AbsLLMModel(ABC, BaseComponent):
         """
         raise Exception("未实现的生成方法")
 
+    async def batch_generate(self, parameters: list[BaseCompletionParameter],
+                             max_concurrency: int = DEFAULT_MAX_CONCURRENCY) -> list[list[ModelResponse]]:
+        """并发执行多个相互独立的补全请求。
+
+        所有请求在当前事件循环中通过 asyncio.gather 并发发出并复用同一个连接池；设置了 rate_limiter 时仍按其限速。
+        请求最终经由 async_completions 发出，同时在途的请求数同样受模型的 max_concurrency 属性限制，
+        实际并发数为两者中的较小值；需要更高并发时，构造模型时调大 BaseLLMParameter.max_concurrency。
+
+        Args:
+            parameters (list[BaseCompletionParameter]): 补全参数列表。
+            max_concurrency (int): 本批次的最大并发请求数。
+
+        Returns:
+            list[list[ModelResponse]]: 与 parameters 顺序一致的结果，每项为该请求产出的全部响应，
+            非流式请求只有一个元素。
+
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(parameter: BaseCompletionParameter) -> list[ModelResponse]:
+            async with semaphore:
+                return [response async for response in self.async_generate(parameter)]
+
+        return list(await asyncio.gather(*(run(parameter) for parameter in parameters)))
+
     # @abstractmethod
     def after_response(self, response: ModelResponse) -> None:
         """在模型响应后执行的操作。
@@ -186,7 +536,12 @@ class AbsLLMModel(ABC, BaseComponent):
             # 流式
             result = self.generate(parameter)
             for r in result:
-                yield r.choices[0].message.content
+                # 流式响应块的内容在 delta 中；只携带 role 或结束标记的块没有文本，直接跳过
+                if not r.choices or r.choices[0].delta is None:
+                    continue
+                text = r.choices[0].delta.content
+                if text:
+                    yield text
         else:
             # 同步调用
             result = self.generate(parameter)
@@ -1,4 +1,10 @@
 DEFAULT_MAX_RETRIES = 3
+# AsyncCompletions 同时在途的最大请求数
+DEFAULT_MAX_CONCURRENCY = 16
+# 批量 embedding 时每个请求携带的最大文本数
+DEFAULT_EMBED_BATCH_SIZE = 128
+# embedding 缓存的最大条目数，每条是单段文本的向量（1024 维 float 的 JSON 约 20KB，上限约 40MB）
+EMBED_CACHE_SIZE = 2048
 DEFAULT_MAX_NEW_TOKENS = 4096
 DEFAULT_TEMPERATURE = 0.7
 DEFAULT_MODEL = "llama3pro"
@@ -1,8 +1,8 @@
 from typing import Any, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter, model_validator
 
-from .constants import DEFAULT_EMBED_MODEL, DEFAULT_MAX_RETRIES
+from .constants import DEFAULT_EMBED_MODEL, DEFAULT_MAX_CONCURRENCY, DEFAULT_MAX_RETRIES
 
 
 class BaseMessage(BaseModel):
@@ -10,6 +10,10 @@ class BaseMessage(BaseModel):
     content: str | None = Field(default="")
 
 
+# 整个消息列表一次性序列化，比逐条调用 model_dump 少走一遍 Python 层的分发
+MESSAGE_LIST_ADAPTER = TypeAdapter(list[BaseMessage])
+
+
 class SystemMessage(BaseMessage):
     role: str = Field("system")
 
@@ -37,7 +41,7 @@ class ModelResponse(BaseModel):
         description="object:chat.completions|chat.completions.chunk",
     )
     created: int = Field(default=None, description="创建时间")
-    choices: list[CompletionsChoice] = Field(default=[], description="消息列表")
+    choices: list[CompletionsChoice] = Field(default_factory=list, description="消息列表")
     usage: dict | None = Field(default=None, description="usage")
     model: str = Field(default="MIX", description="模型")
     system_fingerprint: str = Field(default="MIX", description="系统指纹")
@@ -48,6 +52,9 @@ class BaseLLMParameter(BaseModel):
     base_url: str = None
     full_url: Optional[str] = Field(default=None)
     max_retry: int = DEFAULT_MAX_RETRIES
+    rate_limit: float | None = Field(default=None, description="每秒最多发起的补全请求数（含重试），None 表示不限速")
+    compress: bool = Field(default=True, description="是否允许响应压缩，经过会缓冲压缩流的 SSE 代理时设置为 False")
+    max_concurrency: int = Field(default=DEFAULT_MAX_CONCURRENCY, description="同一事件循环中同时在途的异步补全请求数上限")
 
 
 class BaseCompletionParameter(BaseLLMParameter):
@@ -58,19 +65,24 @@ class BaseCompletionParameter(BaseLLMParameter):
     model:str = "llama3pro"
 
 class EmbedParameter(BaseModel):
-    query: str 
+    query: str | list[str]
     model: str = Field(default=DEFAULT_EMBED_MODEL)
     encoding_format: str = Field(default="float")
+    # 是否使用进程内的 embedding 缓存；自带向量缓存的调用方（如语义切分）关闭它，避免同一向量缓存两份
+    use_cache: bool = Field(default=True)
 
-    def __init__(self, **data: dict[str, Any]) -> None:
-        """初始化方法，接收动态的键值对数据。
+    @model_validator(mode="before")
+    @classmethod
+    def _normalize_query(cls, data: Any) -> Any:
+        """在校验前把 text/input 归一到 query，字段只需校验一次。
 
         Args:
-            **data (dict[str, Any]): 动态传入的键值对数据。
+            data (Any): 传入的原始数据。
+
+        Returns:
+            Any: 归一化后的数据。
 
         """
-        super().__init__(**data)
-        # 检查并赋值参数
-        self.query = data.get("query") or data.get("text") or data.get("input")
-        self.model = data.get("model", DEFAULT_EMBED_MODEL)
-        self.encoding_format = data.get("encoding_format", "float")
+        if isinstance(data, dict) and not data.get("query"):
+            data = {**data, "query": data.get("text") or data.get("input")}
+        return data
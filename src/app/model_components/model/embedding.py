@@ -1,11 +1,22 @@
+import asyncio
 from typing import Any
 
+from src.utils import http_util, json_util
+from src.utils.cache_util import LRUCache, digest_key
+
 from ..base_component import BaseComponent
 from .constants import (
+    DEFAULT_EMBED_BATCH_SIZE,
     DEFAULT_EMBEDDING_PATH,
+    DEFAULT_MAX_CONCURRENCY,
+    EMBED_CACHE_SIZE,
 )
 from .dto import BaseLLMParameter, EmbedParameter
 
+# 进程内共享的 embedding 缓存，按单段文本缓存向量，键包含凭证、接口、模型和编码格式；
+# 缓存单条向量而不是整批响应，内存占用只与条目数成正比，部分命中的批次也只请求未命中的文本
+_embedding_cache = LRUCache(maxsize=EMBED_CACHE_SIZE)
+
 
 class OpenAiStyleEmbeddings(BaseComponent):
     """The OpenAiStyleEmbeddings class is designed to interact with the OpenAI embedding API.
@@ -21,12 +32,12 @@ class OpenAiStyleEmbeddings(BaseComponent):
         self.base_url = parameter.base_url
         self.full_url = parameter.full_url
         self.max_retry = parameter.max_retry
+        self._embed_url = self.full_url or (self.base_url + DEFAULT_EMBEDDING_PATH if self.base_url else None)
+        self._headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
 
     @property
     def embed_url(self) -> str:
-        if self.full_url:
-            return self.full_url
-        return self.base_url + DEFAULT_EMBEDDING_PATH
+        return self._embed_url
     
     def create(self, parameter:EmbedParameter) -> dict:
         """Call the embedding interface, ensuring input and output parameters are consistent with the OpenAI interface.
@@ -42,23 +53,163 @@ class OpenAiStyleEmbeddings(BaseComponent):
             dict: The return value of the embedding interface call, containing the embedding results.
 
         """
-        url = self.embed_url
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        data = {
+        texts, cached, missing = self._lookup(parameter)
+        data = []
+        if missing is not None:
+            # 与补全接口共享连接池，多次 embedding 请求复用已建立的连接
+            response = http_util.get_client().post(
+                self._embed_url, headers=self._headers, json=self._build_request(missing)
+            )
+            response.raise_for_status()
+            data = json_util.loads(response.content)["data"]
+        return self._assemble(parameter, texts, cached, missing, data)
+
+    async def async_create(self, parameter: EmbedParameter) -> list:
+        """Asynchronous version of create, using the event loop's shared AsyncClient.
+
+        Args:
+            parameter (EmbedParameter): An object containing the input query, model, and encoding format.
+
+        Returns:
+            list: The embedding items returned by the interface.
+
+        """
+        texts, cached, missing = self._lookup(parameter)
+        data = []
+        if missing is not None:
+            response = await http_util.get_async_client().post(
+                self._embed_url, headers=self._headers, json=self._build_request(missing)
+            )
+            response.raise_for_status()
+            data = json_util.loads(response.content)["data"]
+        return self._assemble(parameter, texts, cached, missing, data)
+
+    async def async_batch_create(self, texts: list[str], model: str | None = None,
+                                 batch_size: int = DEFAULT_EMBED_BATCH_SIZE,
+                                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY) -> list:
+        """Embed a large list of texts with one request per batch, sending the batches concurrently.
+
+        Args:
+            texts (list[str]): The texts to embed.
+            model (str | None): The embedding model to use, default is the EmbedParameter default.
+            batch_size (int): Maximum number of texts sent in a single request.
+            max_concurrency (int): Maximum number of batch requests in flight at once.
+
+        Returns:
+            list: One embedding item per input text, in input order, with "index" relative to texts.
+
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(offset: int) -> list:
+            batch = texts[offset:offset + batch_size]
+            parameter = EmbedParameter(query=batch, model=model) if model else EmbedParameter(query=batch)
+            async with semaphore:
+                items = await self.async_create(parameter)
+            items = sorted(items, key=lambda item: item.get("index", 0))
+            for position, item in enumerate(items):
+                item["index"] = offset + position
+            return items
+
+        batches = await asyncio.gather(*(run(offset) for offset in range(0, len(texts), batch_size)))
+        return [item for batch in batches for item in batch]
+
+    def _cache_key(self, parameter: EmbedParameter, text: str) -> bytes:
+        """Hash the credentials, endpoint, model, encoding format and a single text into a cache key.
+
+        Args:
+            parameter (EmbedParameter): The request the text belongs to.
+            text (str): One input text.
+
+        Returns:
+            bytes: The cache key.
+
+        """
+        # 认证头参与摘要，凭证无效的请求不会命中其他凭证缓存的结果
+        return digest_key(self._headers["Authorization"], self._embed_url or "",
+                          parameter.model, parameter.encoding_format, text)
+
+    def _lookup(self, parameter: EmbedParameter) -> tuple[list[str], list[bytes | None], EmbedParameter | None]:
+        """Look up every input text in the cache and build a request for the misses.
+
+        With ``use_cache`` off nothing is looked up and the request is sent unchanged.
+
+        Args:
+            parameter (EmbedParameter): An object containing the input query, model, and encoding format.
+
+        Returns:
+            tuple[list[str], list[bytes | None], EmbedParameter | None]: The input texts, the cached item
+            for each of them (None on a miss), and a request for the distinct missing texts,
+            or None when everything was cached.
+
+        """
+        query = parameter.query
+        texts = [query] if isinstance(query, str) else list(query)
+        if not parameter.use_cache:
+            return texts, [None] * len(texts), parameter
+        cached = [_embedding_cache.get(self._cache_key(parameter, text)) for text in texts]
+        missing = list(dict.fromkeys(text for text, item in zip(texts, cached) if item is None))
+        if not missing:
+            return texts, cached, None
+        # 单条文本保持以字符串形式发送，与未命中缓存时的原始请求一致
+        missing_query = missing[0] if isinstance(query, str) else missing
+        return texts, cached, EmbedParameter.model_construct(
+            query=missing_query, model=parameter.model, encoding_format=parameter.encoding_format
+        )
+
+    def _assemble(self, parameter: EmbedParameter, texts: list[str], cached: list[bytes | None],
+                  missing: EmbedParameter | None, data: list) -> list:
+        """Cache the freshly fetched items and merge them with the cached ones in input order.
+
+        With ``use_cache`` off the items are returned as received and nothing is cached.
+
+        Args:
+            parameter (EmbedParameter): The original request.
+            texts (list[str]): The input texts.
+            cached (list[bytes | None]): The cached item for each text, None on a miss.
+            missing (EmbedParameter | None): The request sent for the missing texts.
+            data (list): The items returned for ``missing``.
+
+        Returns:
+            list: One embedding item per input text, with "index" relative to texts.
+
+        """
+        if not parameter.use_cache:
+            return data
+        fetched = {}
+        if missing is not None:
+            query = missing.query
+            missing_texts = [query] if isinstance(query, str) else query
+            for text, item in zip(missing_texts, sorted(data, key=lambda item: item.get("index", 0))):
+                item.pop("index", None)
+                content = json_util.dumps(item)
+                _embedding_cache.put(self._cache_key(parameter, text), content)
+                fetched[text] = content
+        # 缓存的是单条结果的 JSON 字节，每次重新解析，调用方修改返回值不会影响缓存
+        result = []
+        for index, (text, content) in enumerate(zip(texts, cached)):
+            item = json_util.loads(content if content is not None else fetched[text])
+            item["index"] = index
+            result.append(item)
+        return result
+
+    def _build_request(self, parameter: EmbedParameter) -> dict[str, Any]:
+        """Build the JSON body of an embedding request.
+
+        ``input`` is passed through unchanged, so a list query is embedded in a single request.
+
+        Args:
+            parameter (EmbedParameter): An object containing the input query, model, and encoding format.
+
+        Returns:
+            dict[str, Any]: The request body.
+
+        """
+        return {
             "input": parameter.query,
             "model": parameter.model,
             "encoding_format": parameter.encoding_format
         }
-        
-        import httpx
-
-        with httpx.Client(timeout=30) as client:
-            response = client.post(url, headers=headers, json=data)
-            response.raise_for_status()
-            return response.json()["data"]
 
     def __call__(self, *args: tuple[dict[str, Any], ...], **kwds: dict[str, Any]) -> dict:
         """Call the embedding interface with the provided parameters.
@@ -92,4 +243,5 @@ class ChromaAdaptEmbeddings(OpenAiStyleEmbeddings):
             dict: The result of the embedding interface call.
 
         """
-        return self.create(EmbedParameter({"query": input[0]}))
+        # 整批输入一次请求完成，不再只取第一条
+        return self.create(EmbedParameter(query=list(input)))
@@ -1,10 +1,13 @@
+import asyncio
+import time
+from collections.abc import AsyncGenerator
 from datetime import datetime
 from typing import Any
 
 import httpx
-import requests
 from pydantic import BaseModel, Field
 
+from src.utils import http_util, json_util, retry_util
 from src.utils.logger import logger
 
 from .base import AbsLLMModel
@@ -16,6 +19,7 @@ from .constants import (
     DEFAULT_TOP_P,
 )
 from .dto import (
+    MESSAGE_LIST_ADAPTER,
     AIMessage,
     BaseCompletionParameter,
     BaseLLMParameter,
@@ -28,6 +32,8 @@ DEFAULT_MODEL = "llama3pro"
 COMPLETION_PATH = "/v1/chat/completions"
 MODEL_PATH = "/v1/models"
 EMBEDDING_PATH = "/v1/embeddings"
+# mix 接口的请求超时时间（秒）
+MIX_TIMEOUT = 30
 
 
 class MixResponse(BaseModel):
@@ -39,11 +45,11 @@ class MixResponse(BaseModel):
 
 
 class MixParameter(BaseModel):
-    max_new_tokens: int = (DEFAULT_MAX_NEW_TOKENS,)
-    temperature: float = (DEFAULT_TEMPERATURE,)
-    top_p: float = (0.95,)
-    top_n: int = (50,)
-    repetition_penalty: float = 1.1
+    max_new_tokens: int = DEFAULT_MAX_NEW_TOKENS
+    temperature: float = DEFAULT_TEMPERATURE
+    top_p: float = DEFAULT_TOP_P
+    top_n: int = DEFAULT_TOP_N
+    repetition_penalty: float = DEFAULT_REPETITION_PENALTY
 
 
 class MixRequestModel(BaseModel):
@@ -73,7 +79,7 @@ class MixRequestModel(BaseModel):
             MixRequestModel: MixRequestModel 的实例。
 
         """
-        messages_dict = [message.model_dump() for message in messages]
+        messages_dict = MESSAGE_LIST_ADAPTER.dump_python(messages)
         return cls(
             external_call_type=model,
             messages=messages_dict,
@@ -83,11 +89,11 @@ class MixRequestModel(BaseModel):
 
 
 class MixLLMParameter(BaseLLMParameter):
-    model: str = (Field(default=DEFAULT_MODEL),)
+    model: str = Field(default=DEFAULT_MODEL)
     max_new_tokens: int = Field(default=DEFAULT_MAX_NEW_TOKENS, description="最大token")
-    temperature: float = (Field(default=DEFAULT_TEMPERATURE),)
-    top_p: float = (Field(default=DEFAULT_TOP_P),)
-    top_n: int = (Field(default=DEFAULT_TOP_N),)
+    temperature: float = Field(default=DEFAULT_TEMPERATURE)
+    top_p: float = Field(default=DEFAULT_TOP_P)
+    top_n: int = Field(default=DEFAULT_TOP_N)
     repetition_penalty: float = Field(default=DEFAULT_REPETITION_PENALTY)
 
 
@@ -103,6 +109,8 @@ class Mix(AbsLLMModel):
         self.full_url = parameter.full_url
         self.base_url = parameter.base_url
         self.external_call_type = parameter.model
+        # 请求头在实例生命周期内不变，构造时创建一次
+        self._headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
 
         self.validate_custom_rules()
 
@@ -119,6 +127,9 @@ class Mix(AbsLLMModel):
         pass
 
     def generate(self, parameter: BaseCompletionParameter) -> ModelResponse:  # type: ignore
+        if parameter.stream:
+            raise Exception("stream is not supported in mix")
+
         # 创建请求模型
         request_model = self.__build_request_model(
             parameter.messages,
@@ -127,51 +138,103 @@ class Mix(AbsLLMModel):
             parameter.model,
             parameter.stream,
         )
+        # 请求体只序列化为 JSON 字节一次，重试时直接复用
+        body = json_util.dumps(request_model.model_dump())
 
-        # 发送 POST 请求，获取响应
+        # 发送 POST 请求，获取响应；复用进程内共享的连接池
+        client = http_util.get_client()
         count = 0
+        last_error = None
         while count < self.max_retry:
-            # print(f"count:{str(count)}")
-            """
-            发送请求到 completion URL。
-
-            Args:
-                request_model: 包含请求数据的模型。
-
-            Returns:
-                Response: 请求的响应。
-            """
             try:
-                response = requests.post(
+                response = client.post(
                     self.completion_url,
-                    json=request_model.model_dump(),
-                    headers={"Authorization": f"Bearer {self.api_key}"},
-                    timeout=30  # 设置超时时间为 30 秒
-
+                    content=body,
+                    headers=self._headers,
+                    timeout=MIX_TIMEOUT,
                 )
                 response.raise_for_status()
-                break
-            except requests.Timeout:
-                print("请求超时，请检查网络或服务状态")
-                count = count + 1
-            except requests.RequestException as e:
-                # 处理请求异常
+                return self.__build_model_response(response.content)
+            except httpx.HTTPError as e:
+                # 处理请求异常：4xx（429 除外）不再重试，其余情况退避后重试
                 logger.info(f"请求失败: {e}")
+                if not retry_util.is_retryable(e):
+                    raise
+                last_error = e
                 count = count + 1
+                if count < self.max_retry:
+                    time.sleep(retry_util.backoff_delay(count, e))
+        raise Exception(f"mix接口请求失败，已重试{self.max_retry}次") from last_error
+
+    async def async_generate(self, parameter: BaseCompletionParameter) -> AsyncGenerator[ModelResponse, None]:
+        """generate 的异步版本，等待模型输出时不阻塞事件循环。
+
+        Args:
+            parameter (BaseCompletionParameter): 补全参数。
+
+        Yields:
+            ModelResponse: 模型的响应对象，mix 不支持流式，只产出一个结果。
 
+        """
         if parameter.stream:
             raise Exception("stream is not supported in mix")
 
-        # 如果不使用流式返回
-        data = response.json()  # 获取响应的 JSON 数据
-        result = MixResponse(**data)  # 将响应数据映射到模型
-        return ModelResponse(
+        request_model = self.__build_request_model(
+            parameter.messages,
+            parameter.temperature,
+            parameter.max_new_tokens,
+            parameter.model,
+            parameter.stream,
+        )
+        body = json_util.dumps(request_model.model_dump())
+
+        client = http_util.get_async_client()
+        count = 0
+        last_error = None
+        while count < self.max_retry:
+            try:
+                response = await client.post(
+                    self.completion_url,
+                    content=body,
+                    headers=self._headers,
+                    timeout=MIX_TIMEOUT,
+                )
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                logger.info(f"请求失败: {e}")
+                if not retry_util.is_retryable(e):
+                    raise
+                last_error = e
+                count = count + 1
+                if count < self.max_retry:
+                    await asyncio.sleep(retry_util.backoff_delay(count, e))
+            else:
+                yield self.__build_model_response(response.content)
+                return
+        raise Exception(f"mix接口请求失败，已重试{self.max_retry}次") from last_error
+
+    def __build_model_response(self, content: bytes) -> ModelResponse:
+        """将 mix 接口的响应转换为 ModelResponse。
+
+        响应体只在 MixResponse 处解析并校验一次；ModelResponse 的字段都来自已校验的结果，
+        直接用 model_construct 构造，不再重复校验。
+
+        Args:
+            content (bytes): 接口返回的原始 JSON 响应体。
+
+        Returns:
+            ModelResponse: 模型的响应对象。
+
+        """
+        result = MixResponse.model_validate_json(content)  # 将响应数据映射到模型
+        return ModelResponse.model_construct(
             id="",
             object="chat.completions",
             created=int(datetime.now().timestamp() * 1000),
             choices=[
-                CompletionsChoice(
-                    message=AIMessage(content=result.Response),
+                CompletionsChoice.model_construct(
+                    message=AIMessage.model_construct(role="assistant", content=result.Response),
+                    delta=None,
                     index=0,
                     logprobs=None,
                     finish_reason="stop",
@@ -195,18 +258,19 @@ class Mix(AbsLLMModel):
             messages, temperature, max_new_tokens, model, stream
         )
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.completion_url,
-                json=request_model.model_dump(),
-                headers={"Authorization": f"Bearer {self.api_key}"},
-            )
-            response.raise_for_status()
-
-            # 如果不使用流式返回
-            data = response.json()  # 获取响应的 JSON 数据
-            result = MixResponse(**data)  # 将响应数据映射到模型
-            yield result.choices[0].message.content
+        # 复用当前事件循环共享的连接池，不再每次调用都新建 AsyncClient
+        client = http_util.get_async_client()
+        response = await client.post(
+            self.completion_url,
+            json=request_model.model_dump(),
+            headers=self._headers,
+        )
+        response.raise_for_status()
+
+        # 如果不使用流式返回
+        data = response.json()  # 获取响应的 JSON 数据
+        result = MixResponse(**data)  # 将响应数据映射到模型
+        yield result.choices[0].message.content
 
     def __build_request_model(
         self,
@@ -1,11 +1,12 @@
+import logging
 from collections.abc import AsyncGenerator
 
-import httpx
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
+from src.utils import http_util
 from src.utils.logger import logger
 
-from .base import AbsLLMModel
+from .base import AbsLLMModel, _aiter_lines
 from .constants import (
     DEFAULT_EMBED_MODEL,
     DEFAULT_MAX_NEW_TOKENS,
@@ -15,10 +16,19 @@ from .constants import (
     DEFAULT_TOP_N,
     DEFAULT_TOP_P,
 )
-from .dto import BaseCompletionParameter, BaseLLMParameter, BaseMessage, ModelResponse
+from .dto import (
+    MESSAGE_LIST_ADAPTER,
+    BaseCompletionParameter,
+    BaseLLMParameter,
+    BaseMessage,
+    ModelResponse,
+)
 
 
 class RequestModel(BaseModel):
+    # 请求模型构造后只读；额外字段忽略、赋值不校验、嵌套实例不重新校验均为 pydantic v2 默认行为
+    model_config = ConfigDict(frozen=True)
+
     model: str
     messages: list[dict]
     max_new_tokens: int = DEFAULT_MAX_NEW_TOKENS
@@ -50,7 +60,7 @@ class RequestModel(BaseModel):
             RequestModel: 当前类的实例。
 
         """
-        messages_dict = [message.model_dump() for message in messages]
+        messages_dict = MESSAGE_LIST_ADAPTER.dump_python(messages)
         return cls(
             model=model,
             messages=messages_dict,
@@ -62,6 +72,8 @@ class RequestModel(BaseModel):
 
 
 class OpenAiStyleLLMParameter(BaseLLMParameter):
+    model_config = ConfigDict(frozen=True)
+
     model: str = Field(default=DEFAULT_MODEL)
     max_new_tokens: int = Field(default=DEFAULT_MAX_NEW_TOKENS)
     temperature: float = Field(default=DEFAULT_TEMPERATURE)
@@ -102,9 +114,10 @@ class OpenAiStyleModel(AbsLLMModel):
 
     
     async def async_generate(self, parameter: BaseCompletionParameter) -> AsyncGenerator[ModelResponse, None]:
-        # 发送 POST 请求，获取响应，支持流式输出
+        # 发送 POST 请求，获取响应，支持流式输出；基于 AsyncClient，等待模型输出时不阻塞事件循环
         count = 0
-        for count, response in enumerate(self.completions.create(parameter), start=1):
+        async for response in self.async_completions.create(parameter):
+            count += 1
             yield response
             if count >= parameter.max_new_tokens:  # 根据需要限制输出数量
                 break
@@ -119,14 +132,21 @@ class OpenAiStyleModel(AbsLLMModel):
             parameter.messages, parameter.temperature, parameter.max_new_tokens, parameter.stream
         )
 
-        async with httpx.AsyncClient() as client, client.post(
+        # 复用当前事件循环共享的连接池，以 stream 方式打开响应，边接收边输出
+        client = http_util.get_async_client()
+        async with client.stream(
+            "POST",
             self.completion_url,
-            json=request_model.model_dump(),
-            headers={"Authorization": f"Bearer {self.api_key}"},
+            # model_dump_json 在 pydantic-core 中一次完成序列化，不再经过中间 dict 和 httpx 的 json.dumps
+            content=request_model.model_dump_json(),
+            headers={"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"},
         ) as response:
-                async for line in response.aiter_lines():
-                    if line:
-                        yield line  # 逐行输出结果
+            response.raise_for_status()
+            # 直接在字节缓冲区上按换行切分，只解码完整的非空行
+            async for line in _aiter_lines(response.aiter_bytes()):
+                line = line.rstrip(b"\r")
+                if line:
+                    yield line.decode("utf-8")  # 逐行输出结果
 
         # async with httpx.AsyncClient() as client:
         #     response = await client.post(
@@ -168,7 +188,9 @@ class OpenAiStyleModel(AbsLLMModel):
             stream=stream,
         )
 
-        logger.info(f"构建的模型请求参数：{request_model.model_dump()}")
+        # 每个请求都会经过这里，只在开启 DEBUG 时才序列化请求参数用于日志
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("构建的模型请求参数：%s", request_model.model_dump_json())
         return request_model
 
     # def __call__(self, *args: tuple[dict[str, Any], ...], **kwds: dict[str, Any]) -> Iterator[ModelResponse]:
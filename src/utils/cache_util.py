@@ -0,0 +1,77 @@
+"""
+    线程安全的 LRU 缓存
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any
+
+
+class LRUCache:
+    """基于 OrderedDict 的线程安全 LRU 缓存，超过容量时淘汰最久未使用的条目。"""
+
+    def __init__(self, maxsize: int = 10_000) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """读取缓存，命中时将条目标记为最近使用。
+
+        Args:
+            key (Hashable): 缓存键。
+            default (Any): 未命中时返回的默认值。
+
+        Returns:
+            Any: 缓存值或默认值。
+
+        """
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """写入缓存，超出容量时淘汰最久未使用的条目。
+
+        Args:
+            key (Hashable): 缓存键。
+            value (Any): 缓存值。
+
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """清空缓存。"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def digest_key(*parts: str | bytes) -> bytes:
+    """将若干文本/字节片段哈希为定长的缓存键。
+
+    Args:
+        *parts (str | bytes): 参与计算的片段，顺序敏感。
+
+    Returns:
+        bytes: 16 字节的 blake2b 摘要。
+
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        # 写入长度前缀，避免 ("ab", "c") 与 ("a", "bc") 产生相同的键
+        hasher.update(len(part).to_bytes(8, "little"))
+        hasher.update(part)
+    return hasher.digest()
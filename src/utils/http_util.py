@@ -0,0 +1,75 @@
+"""
+    进程内共享的 httpx 连接池
+
+    所有模型/embedding 请求复用同一个 Client，相同主机的后续请求不再重复进行 TCP/TLS 握手。
+    客户端在首次使用时创建，关闭后再次获取会自动重建。
+"""
+import asyncio
+import importlib.util
+import threading
+import weakref
+
+import httpx
+
+# 模型服务生成较长内容时响应较慢，读超时放宽，连接超时保持较短
+DEFAULT_TIMEOUT = httpx.Timeout(300.0, connect=10.0)
+DEFAULT_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=100)
+# 异步场景下并发更高，允许更多的在途连接
+DEFAULT_ASYNC_LIMITS = httpx.Limits(max_keepalive_connections=50, max_connections=200)
+# 安装了 h2 时启用 HTTP/2，并发请求可以复用同一条 TLS 连接；明文 http:// 服务仍走 HTTP/1.1
+HTTP2_ENABLED = importlib.util.find_spec("h2") is not None
+
+_client: httpx.Client | None = None
+_lock = threading.Lock()
+# AsyncClient 的连接绑定在创建它的事件循环上，因此每个事件循环各自缓存一个
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_client() -> httpx.Client:
+    """获取共享的同步 httpx.Client。
+
+    Returns:
+        httpx.Client: 带连接池的共享客户端。
+
+    """
+    global _client
+    client = _client
+    if client is None or client.is_closed:
+        with _lock:
+            if _client is None or _client.is_closed:
+                _client = httpx.Client(timeout=DEFAULT_TIMEOUT, limits=DEFAULT_LIMITS, http2=HTTP2_ENABLED)
+            client = _client
+    return client
+
+
+def close_client() -> None:
+    """关闭共享的同步客户端，下次调用 get_client 时重新创建。"""
+    global _client
+    with _lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """获取当前事件循环共享的 httpx.AsyncClient，必须在协程中调用。
+
+    Returns:
+        httpx.AsyncClient: 带连接池的共享异步客户端。
+
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(timeout=DEFAULT_TIMEOUT, limits=DEFAULT_ASYNC_LIMITS, http2=HTTP2_ENABLED)
+        _async_clients[loop] = client
+    return client
+
+
+async def aclose_async_client() -> None:
+    """关闭当前事件循环共享的异步客户端，下次调用 get_async_client 时重新创建。"""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
@@ -0,0 +1,46 @@
+"""
+    JSON 序列化工具
+
+    优先使用 orjson（C 实现，直接处理 bytes），未安装时回退到标准库 json。
+    orjson 会把超出 64 位的整数转成浮点数，也不接受 NaN/Infinity，只适合模型接口这类格式确定的数据；
+    需要原样保留任意 JSON 内容（如用户上传的文档）时请直接使用标准库 json。
+"""
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 未安装 orjson 时走标准库
+    orjson = None
+
+
+def loads(data: str | bytes | bytearray | memoryview) -> Any:
+    """将 JSON 文本或字节解析为 Python 对象。
+
+    Args:
+        data (str | bytes | bytearray | memoryview): JSON 数据。
+
+    Returns:
+        Any: 解析后的 Python 对象。
+
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    """将 Python 对象序列化为 UTF-8 编码的 JSON 字节。
+
+    Args:
+        obj (Any): 需要序列化的对象。
+
+    Returns:
+        bytes: JSON 字节串，可直接作为 HTTP 请求体。
+
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
@@ -0,0 +1,96 @@
+"""
+    重试与限流工具
+
+    提供令牌桶限流器、可重试异常判断以及带抖动的指数退避时间计算。
+"""
+import asyncio
+import random
+import threading
+import time
+
+import httpx
+
+# 退避的基础时长与上限（秒）
+BACKOFF_BASE = 0.1
+BACKOFF_MAX = 10.0
+
+
+class TokenBucket:
+    """线程安全的令牌桶限流器。
+
+    令牌按 rate 个/秒匀速补充，最多累积 capacity 个。令牌不足时按先来后到预约，
+    调用方只需等待到自己的令牌生成即可，不需要轮询。
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """取走一个令牌。
+
+        Returns:
+            float: 需要等待的秒数，令牌充足时为 0。
+
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self) -> None:
+        """同步获取一个令牌，必要时阻塞等待。"""
+        wait = self._reserve()
+        if wait:
+            time.sleep(wait)
+
+    async def aacquire(self) -> None:
+        """异步获取一个令牌，等待期间不阻塞事件循环。"""
+        wait = self._reserve()
+        if wait:
+            await asyncio.sleep(wait)
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """判断异常是否值得重试。
+
+    429 和 5xx 属于服务端暂时不可用，其余 4xx（如 401、400）重试也不会成功。
+    网络错误、超时以及响应内容不合法等情况仍然重试。
+
+    Args:
+        exc (BaseException): 捕获到的异常。
+
+    Returns:
+        bool: 是否应该重试。
+
+    """
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        return status == 429 or status >= 500
+    return True
+
+
+def backoff_delay(attempt: int, exc: BaseException | None = None) -> float:
+    """计算第 attempt 次失败后的等待时长。
+
+    使用带随机抖动的指数退避，服务端通过 Retry-After 指定了等待时间时取两者中较大者。
+
+    Args:
+        attempt (int): 已失败的次数，从 1 开始。
+        exc (BaseException | None): 本次失败的异常。
+
+    Returns:
+        float: 等待秒数，不超过 BACKOFF_MAX。
+
+    """
+    delay = BACKOFF_BASE * 2 ** (attempt - 1) + random.random() * BACKOFF_BASE
+    if isinstance(exc, httpx.HTTPStatusError):
+        retry_after = exc.response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, float(retry_after))
+    return min(delay, BACKOFF_MAX)
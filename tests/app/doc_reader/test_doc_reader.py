@@ -76,6 +76,14 @@ Bob,20
         self.assertIn("**key1**: value1", md_result, "Markdown 结果应包含 JSON 字段 key1 的信息。")
         self.assertIn("**key2**: 123", md_result, "Markdown 结果应包含 JSON 字段 key2 的信息。")
 
+    def test_structured_reader_with_mixed_list(self):
+        """
+        测试首个元素是 dict、其余元素类型不一致的列表按段落输出，而不是当作表格。
+        """
+        md_result = self.structured_reader.process([{"a": 1}, "x"])
+
+        self.assertEqual(md_result, "{'a': 1}\n\nx", "混合类型的列表应逐个元素输出为段落。")
+
     def test_structured_reader_with_json_file(self):
         """
         测试 StructuredDocReader 从 JSON 文件中读取数据并转换为 Markdown。
@@ -93,6 +101,90 @@ Bob,20
         if os.path.exists(tmp_file_name):
             os.remove(tmp_file_name)
 
+    def test_structured_reader_keeps_json_values_exact(self):
+        """
+        测试超出 64 位的整数与 NaN/Infinity 按标准库 json 的语义原样读取。
+        """
+        with tempfile.NamedTemporaryFile("w", delete=False, suffix=".json") as tmp_file:
+            tmp_file_name = tmp_file.name
+            tmp_file.write('{"big": 18446744073709551616, "nan": NaN, "inf": -Infinity}')
+
+        try:
+            md_result = self.structured_reader.process(tmp_file_name)
+        finally:
+            os.remove(tmp_file_name)
+        self.assertIn("**big**: 18446744073709551616", md_result, "大整数不应被转换为浮点数。")
+        self.assertIn("**nan**: nan", md_result, "应接受 NaN。")
+        self.assertIn("**inf**: -inf", md_result, "应接受 Infinity。")
+
+    def test_structured_reader_with_streamed_json_array(self):
+        """
+        测试大 JSON 数组走流式解析时，输出与整体解析一致。
+        """
+        import json
+        from unittest import mock
+        from src.app.model_components.doc_reader import structured_reader
+
+        if structured_reader.ijson is None:
+            self.skipTest("未安装 ijson")
+
+        sample_rows = [{"name": "Alice", "age": 18}, {"name": "Bob", "age": 20}]
+        with tempfile.NamedTemporaryFile("w", delete=False, suffix=".json") as tmp_file:
+            tmp_file_name = tmp_file.name
+            json.dump(sample_rows, tmp_file)
+
+        expected = self.structured_reader.process(sample_rows)
+        with mock.patch.object(structured_reader, "STREAM_JSON_MIN_BYTES", 0):
+            md_result = self.structured_reader.process(tmp_file_name)
+        self.assertEqual(md_result, expected, "流式解析的 Markdown 应与整体解析一致。")
+
+        if os.path.exists(tmp_file_name):
+            os.remove(tmp_file_name)
+
+    def test_structured_reader_with_streamed_mixed_json_array(self):
+        """
+        测试流式解析首个元素为对象、后续混有其他类型的 JSON 数组时给出明确的错误。
+        """
+        import json
+        from unittest import mock
+        from src.app.model_components.doc_reader import structured_reader
+
+        if structured_reader.ijson is None:
+            self.skipTest("未安装 ijson")
+
+        with tempfile.NamedTemporaryFile("w", delete=False, suffix=".json") as tmp_file:
+            tmp_file_name = tmp_file.name
+            json.dump([{"a": 1}, "x"], tmp_file)
+
+        try:
+            with mock.patch.object(structured_reader, "STREAM_JSON_MIN_BYTES", 0):
+                with self.assertRaisesRegex(ValueError, "第 1 个元素"):
+                    self.structured_reader.process(tmp_file_name)
+        finally:
+            os.remove(tmp_file_name)
+
+    def test_structured_reader_read_many(self):
+        """
+        测试 StructuredDocReader 批量读取多个文件，结果顺序应与输入一致。
+        """
+        import json
+        tmp_files = []
+        with tempfile.NamedTemporaryFile("w", delete=False, suffix=".csv") as tmp_file:
+            tmp_file.write("name,age\nAlice,18\n")
+            tmp_files.append(tmp_file.name)
+        with tempfile.NamedTemporaryFile("w", delete=False, suffix=".json") as tmp_file:
+            json.dump({"name": "Charlie"}, tmp_file)
+            tmp_files.append(tmp_file.name)
+
+        results = self.structured_reader.read_many(tmp_files + [[1, 2]])
+        self.assertEqual(results[0], [{"name": "Alice", "age": "18"}], "第一个结果应为 CSV 行数据。")
+        self.assertEqual(results[1], {"name": "Charlie"}, "第二个结果应为 JSON 数据。")
+        self.assertEqual(results[2], [1, 2], "直接传入的列表应原样返回。")
+
+        for tmp_file_name in tmp_files:
+            if os.path.exists(tmp_file_name):
+                os.remove(tmp_file_name)
+
     def test_doc_reader_factory_with_csv(self):
         """
         测试 DocReaderFactory 自动识别 CSV 文件并使用对应的 StructuredDocReader。
@@ -122,6 +214,27 @@ valA,valB
         md_result = reader.process(text_input)
         self.assertIn("Just a plain text", md_result, "Markdown 结果应包含原文本。")
 
+    def test_markdown_formatter_convert_tables(self):
+        """
+        测试 convert_tables 与逐个调用 convert_table 再以空行拼接的结果一致，空表格被跳过。
+        """
+        from src.app.model_components.doc_reader.markdown_formatter import MarkdownFormatter
+
+        tables = [
+            [{"name": "Alice", "age": 18}, {"name": "Bob", "age": 20}],
+            [],
+            [{"name": "Carol", "age": 30}],
+            [{"city": "Paris"}, {"city": "Rome"}],
+        ]
+        expected = "\n\n".join(
+            markdown for markdown in map(MarkdownFormatter.convert_table, tables) if markdown
+        )
+
+        # 行也可以流式产出
+        self.assertEqual(MarkdownFormatter.convert_tables(map(iter, tables)), expected)
+        self.assertEqual(expected.count("| name | age |"), 2, "同表头的表格应各自输出表头。")
+        self.assertEqual(MarkdownFormatter.convert_tables([]), "")
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -192,6 +192,25 @@ class TestDocSplitterFactory(unittest.TestCase):
         self.assertEqual(result.strategy, SplitStrategy.FORMAT)
         self.assertTrue(any('First paragraph' in seg for seg in result.segments))
         self.assertTrue(any('Second paragraph' in seg for seg in result.segments))
+
+    def test_format_splitter_split_many(self) -> None:
+        """Test FormatSplitter.split_many keeps input order and matches split()."""
+        splitter = FormatSplitter()
+        parameters = [
+            SplitParameter(
+                text=f"# Document {i}\n\nFirst paragraph of document {i}.\n\nSecond paragraph of document {i}.",
+                strategy=SplitStrategy.FORMAT,
+                min_length=5,
+                max_length=40
+            )
+            for i in range(4)
+        ]
+
+        results = splitter.split_many(parameters, max_workers=2)
+
+        self.assertEqual(len(results), len(parameters))
+        for parameter, result in zip(parameters, results):
+            self.assertEqual(result.segments, splitter.split(parameter).segments)
         
     def test_semantic_splitter_text_similarity(self) -> None:
         """Test SemanticSplitter with text similarity."""
@@ -396,8 +415,9 @@ class TestDocSplitterFactory(unittest.TestCase):
         )
 
         def mock_create(param: EmbedParameter) -> List[Dict[str, Any]]:
-            print(f"\nMocked embedding request for text: {param.query[:50]}...")
-            return [{"embedding": emb_vector}]
+            texts = [param.query] if isinstance(param.query, str) else param.query
+            print(f"\nMocked embedding request for {len(texts)} text(s)")
+            return [{"embedding": emb_vector, "index": i} for i in range(len(texts))]
         
         self.mock_embedding_model.create.side_effect = mock_create
 
@@ -503,8 +523,8 @@ class TestDocSplitterFactory(unittest.TestCase):
         }
         
         # 2. 配置 mock embedding 函数
-        def mock_create(param: EmbedParameter) -> List[Dict[str, Any]]:
-            text = param.query.lower()
+        def embed_text(text: str) -> np.ndarray:
+            text = text.lower()
             print(f"\nProcessing text for embedding: {text[:50]}...")
             
             # 根据文本内容返回对应向量
@@ -518,7 +538,11 @@ class TestDocSplitterFactory(unittest.TestCase):
                 vector = np.array([0.33, 0.33, 0.33])
                 
             print(f"Generated vector: {vector}")
-            return [{"embedding": vector}]
+            return vector
+
+        def mock_create(param: EmbedParameter) -> List[Dict[str, Any]]:
+            texts = [param.query] if isinstance(param.query, str) else param.query
+            return [{"embedding": embed_text(t), "index": i} for i, t in enumerate(texts)]
         
         self.mock_embedding_model.create.side_effect = mock_create
 
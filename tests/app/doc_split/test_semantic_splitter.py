@@ -0,0 +1,115 @@
+"""
+Test suite for SemanticSplitterWithEmbedding internals.
+"""
+
+import importlib.util
+import unittest
+from unittest.mock import Mock, patch
+
+import numpy as np
+
+from src.app.model_components.doc_split import semantic_splitter
+from src.app.model_components.doc_split.constants import LENGTH_UNIT_CHARS, LENGTH_UNIT_TOKENS
+from src.app.model_components.doc_split.dto import SplitParameter, SplitStrategy
+from src.app.model_components.doc_split.semantic_splitter import SemanticSplitterWithEmbedding
+
+
+class _WhitespaceEncoding:
+    """Stand-in for a tiktoken encoding that counts whitespace-separated words."""
+
+    @staticmethod
+    def encode_ordinary_batch(texts: list[str]) -> list[list[str]]:
+        return [text.split() for text in texts]
+
+
+class TestLengthUnits(unittest.TestCase):
+    """Segment lengths can be measured in characters or tokens."""
+
+    SEGMENTS = ["one two three", "abcdefghijkl", "four five"]
+
+    def test_default_unit_is_chars(self) -> None:
+        self.assertEqual(SplitParameter(text="").length_unit, LENGTH_UNIT_CHARS)
+
+    def test_char_lengths(self) -> None:
+        self.assertEqual(semantic_splitter._segment_lengths(self.SEGMENTS, LENGTH_UNIT_CHARS), [13, 12, 9])
+
+    def test_token_lengths(self) -> None:
+        with patch.object(semantic_splitter, "_token_encoding", _WhitespaceEncoding):
+            lengths = semantic_splitter._segment_lengths(self.SEGMENTS, LENGTH_UNIT_TOKENS)
+        self.assertEqual(lengths, [3, 1, 2])
+
+    def test_unknown_unit(self) -> None:
+        with self.assertRaises(ValueError):
+            semantic_splitter._segment_lengths(self.SEGMENTS, "words")
+
+    def test_min_length_is_measured_in_tokens(self) -> None:
+        splitter = SemanticSplitterWithEmbedding()
+        parameter = SplitParameter(text=list(self.SEGMENTS), strategy=SplitStrategy.SEMANTIC,
+                                   min_length=2, length_unit=LENGTH_UNIT_TOKENS)
+
+        with patch.object(semantic_splitter, "_token_encoding", _WhitespaceEncoding):
+            result = splitter.split(parameter)
+
+        # 按 token 计，只有一个 token 的长单词段落被过滤，而按字符计它是最长的段落之一
+        self.assertEqual(result.segments, ["one two three", "four five"])
+
+    @unittest.skipIf(importlib.util.find_spec("tiktoken") is None, "未安装 tiktoken")
+    def test_tiktoken_lengths(self) -> None:
+        import tiktoken
+
+        encoding = tiktoken.get_encoding(semantic_splitter.DEFAULT_TOKEN_ENCODING)
+        expected = [len(encoding.encode_ordinary(segment)) for segment in self.SEGMENTS]
+        self.assertEqual(semantic_splitter._segment_lengths(self.SEGMENTS, LENGTH_UNIT_TOKENS), expected)
+
+
+class TestQuantizedCache(unittest.TestCase):
+    """int8 cached embeddings give the same splits as float32 ones."""
+
+    SEGMENTS = [f"topic {topic} sentence {i}" for topic in "ABC" for i in range(3)]
+
+    def setUp(self) -> None:
+        rng = np.random.default_rng(0)
+        topics = {topic: rng.normal(size=64) for topic in "ABC"}
+        # 同一主题的段落向量相近，不同主题之间几乎正交
+        self.vectors = {
+            text: (topics[text.split()[1]] + 0.3 * rng.normal(size=64)).tolist() for text in self.SEGMENTS
+        }
+
+    def splitter(self, quantize_cache: bool) -> SemanticSplitterWithEmbedding:
+        model = Mock()
+        # 合并后的段落取各行向量之和
+        model.create.side_effect = lambda parameter: [
+            {"index": i, "embedding": np.sum([self.vectors[line] for line in text.split("\n")], axis=0).tolist()}
+            for i, text in enumerate(parameter.query)
+        ]
+        return SemanticSplitterWithEmbedding(embedding_model=model, similarity_threshold=0.8,
+                                             quantize_cache=quantize_cache)
+
+    def test_cached_int8_vectors_match_float32(self) -> None:
+        splitter = self.splitter(quantize_cache=True)
+        fresh = splitter._embed(self.SEGMENTS)
+        cached = splitter._embed(self.SEGMENTS)
+
+        self.assertEqual(splitter.embedding_model.create.call_count, 1)
+        self.assertEqual(cached.dtype, np.float32)
+        np.testing.assert_allclose(cached, fresh, atol=0.02)
+        np.testing.assert_allclose(cached @ cached.T, fresh @ fresh.T, atol=0.01)
+
+    def test_split_results_match(self) -> None:
+        parameter = SplitParameter(text=list(self.SEGMENTS), strategy=SplitStrategy.SEMANTIC,
+                                   min_length=0, max_length=200)
+        expected = self.splitter(quantize_cache=False).split(parameter).segments
+
+        quantized = self.splitter(quantize_cache=True)
+        self.assertEqual(quantized.split(parameter).segments, expected)
+        calls = quantized.embedding_model.create.call_count
+        # 第二次切分的向量全部来自 int8 缓存
+        result = quantized.split(parameter).segments
+
+        self.assertEqual(quantized.embedding_model.create.call_count, calls)
+        self.assertEqual(result, expected)
+        self.assertEqual(len(expected), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
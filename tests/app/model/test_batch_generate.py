@@ -0,0 +1,87 @@
+"""
+Tests for AbsLLMModel.batch_generate, run against an async httpx.MockTransport.
+"""
+
+import asyncio
+import json
+import unittest
+
+import httpx
+
+from src.utils import http_util
+from src.app.model_components.model import base
+from src.app.model_components.model.dto import BaseCompletionParameter
+from src.app.model_components.model.openai_style import OpenAiStyleLLMParameter, OpenAiStyleModel
+
+
+class TestBatchGenerate(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.in_flight = 0
+        self.peak = 0
+        base._completion_cache.clear()
+
+    def tearDown(self) -> None:
+        base._completion_cache.clear()
+
+    async def _handle(self, request: httpx.Request) -> httpx.Response:
+        content = json.loads(request.content)["messages"][0]["content"]
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            # 编号越小等待越久，让请求以与提交相反的顺序完成
+            await asyncio.sleep(0.001 * (20 - int(content)) if content.isdigit() else 0)
+        finally:
+            self.in_flight -= 1
+        if content == "fail":
+            return httpx.Response(400, json={"error": "bad request"})
+        return httpx.Response(200, json={
+            "id": content,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": f"echo {content}"}}],
+        })
+
+    def run_batch(self, contents: list[str], max_concurrency: int = base.DEFAULT_MAX_CONCURRENCY,
+                  model_concurrency: int = base.DEFAULT_MAX_CONCURRENCY) -> list[list[str]]:
+        model = OpenAiStyleModel(OpenAiStyleLLMParameter(
+            api_key="k", full_url="http://llm/v1/chat/completions", max_concurrency=model_concurrency,
+        ))
+        parameters = [
+            BaseCompletionParameter(messages=[{"role": "user", "content": c}], max_new_tokens=16)
+            for c in contents
+        ]
+
+        async def run() -> list[list[str]]:
+            http_util._async_clients[asyncio.get_running_loop()] = httpx.AsyncClient(
+                transport=httpx.MockTransport(self._handle)
+            )
+            try:
+                results = await model.batch_generate(parameters, max_concurrency=max_concurrency)
+            finally:
+                await http_util.aclose_async_client()
+            return [[r.choices[0].message.content for r in responses] for responses in results]
+
+        return asyncio.run(run())
+
+    def test_results_follow_input_order(self) -> None:
+        contents = [str(i) for i in range(10)]
+        results = self.run_batch(contents)
+
+        self.assertEqual(results, [[f"echo {c}"] for c in contents])
+
+    def test_concurrency_is_limited_by_batch(self) -> None:
+        self.run_batch([str(i) for i in range(10)], max_concurrency=2)
+
+        self.assertEqual(self.peak, 2)
+
+    def test_concurrency_is_limited_by_model(self) -> None:
+        self.run_batch([str(i) for i in range(10)], max_concurrency=8, model_concurrency=3)
+
+        self.assertEqual(self.peak, 3)
+
+    def test_failing_request_fails_the_batch(self) -> None:
+        with self.assertRaises(httpx.HTTPStatusError):
+            self.run_batch(["1", "2", "fail", "3"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,331 @@
+"""
+Tests for the streaming and retry behaviour of Completions / AsyncCompletions.
+
+Requests never leave the process: the shared http_util clients are replaced
+with clients backed by httpx.MockTransport.
+"""
+
+import asyncio
+import json
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+from src.utils import http_util
+from src.app.model_components.model import base
+from src.app.model_components.model.base import AsyncCompletions, Completions
+from src.app.model_components.model.dto import BaseCompletionParameter
+
+
+def _sse(*contents: str) -> list[bytes]:
+    """Build one SSE event per content piece, followed by [DONE]."""
+    events = [
+        b"data: " + json.dumps({"id": "1", "choices": [{"index": 0, "delta": {"content": c}}]}).encode() + b"\n\n"
+        for c in contents
+    ]
+    return events + [b"data: [DONE]\n\n"]
+
+
+async def _no_wait(_delay: float) -> None:
+    return None
+
+
+class _BrokenStream(httpx.SyncByteStream, httpx.AsyncByteStream):
+    """Response body that yields some chunks and then drops the connection."""
+
+    def __init__(self, chunks: list[bytes]) -> None:
+        self.chunks = chunks
+
+    def __iter__(self):
+        yield from self.chunks
+        raise httpx.ReadError("connection reset")
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            yield chunk
+        raise httpx.ReadError("connection reset")
+
+
+class CompletionsTestCase(unittest.TestCase):
+    """Base class that routes the shared clients through a MockTransport."""
+
+    def setUp(self) -> None:
+        self.requests: list[httpx.Request] = []
+        self.responses: list = []
+        base._completion_cache.clear()
+        self.sync_client = httpx.Client(transport=httpx.MockTransport(self._handle))
+        patcher = patch.object(http_util, "_client", self.sync_client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # 重试之间不真正等待
+        for patcher in (
+            patch.object(base.time, "sleep", lambda _delay: None),
+            patch.object(base.asyncio, "sleep", _no_wait),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self) -> None:
+        self.sync_client.close()
+        base._completion_cache.clear()
+
+    def _handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        response = self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+        return response() if callable(response) else response
+
+    @staticmethod
+    def parameter(stream: bool = False, temperature: float = 0.95) -> BaseCompletionParameter:
+        return BaseCompletionParameter(
+            messages=[{"role": "user", "content": "hi"}], stream=stream, temperature=temperature
+        )
+
+    def run_async(self, completions: AsyncCompletions, parameter: BaseCompletionParameter) -> list[str]:
+        """Run AsyncCompletions.create on a fresh loop, collecting delta contents."""
+
+        async def collect() -> list[str]:
+            http_util._async_clients[asyncio.get_running_loop()] = httpx.AsyncClient(
+                transport=httpx.MockTransport(self._handle)
+            )
+            try:
+                return [r.choices[0].delta.content async for r in completions.create(parameter)]
+            finally:
+                await http_util.aclose_async_client()
+
+        return asyncio.run(collect())
+
+
+class _ChunkedStream(httpx.SyncByteStream, httpx.AsyncByteStream):
+    """Response body delivered in caller-chosen chunks."""
+
+    def __init__(self, chunks: list[bytes]) -> None:
+        self.chunks = chunks
+
+    def __iter__(self):
+        yield from self.chunks
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+class TestLineSplitting(unittest.TestCase):
+    """_iter_lines / _aiter_lines reassemble lines from arbitrary chunks."""
+
+    CHUNKS = [b"da", b"ta: 1\n", b"\ndata: ", b"2\r\n", b"data: 3"]
+    EXPECTED = [b"data: 1", b"", b"data: 2\r", b"data: 3"]
+
+    def test_iter_lines(self) -> None:
+        self.assertEqual(list(base._iter_lines(self.CHUNKS)), self.EXPECTED)
+
+    def test_aiter_lines(self) -> None:
+        async def chunks():
+            for chunk in self.CHUNKS:
+                yield chunk
+
+        async def collect() -> list[bytes]:
+            return [line async for line in base._aiter_lines(chunks())]
+
+        self.assertEqual(asyncio.run(collect()), self.EXPECTED)
+
+    def test_line_spanning_many_chunks(self) -> None:
+        line = b"x" * 1000
+        chunks = [line[i:i + 7] for i in range(0, len(line), 7)] + [b"\n"]
+        self.assertEqual(list(base._iter_lines(chunks)), [line])
+
+
+class TestSsePayload(unittest.TestCase):
+    """_sse_payload extracts JSON payloads and skips non-data lines."""
+
+    def test_data_line(self) -> None:
+        self.assertEqual(base._sse_payload(b'data: {"a": "data: b"}'), b'{"a": "data: b"}')
+        self.assertEqual(base._sse_payload(b'data:{"a": 1}\r'), b'{"a": 1}')
+
+    def test_skipped_lines(self) -> None:
+        for line in (b"", b"\r", b": keep-alive", b"event: message", b"id: 7", b"retry: 1000"):
+            self.assertIsNone(base._sse_payload(line), line)
+
+    def test_done_and_ndjson(self) -> None:
+        self.assertEqual(base._sse_payload(b"data: [DONE]"), base._SSE_DONE)
+        self.assertEqual(base._sse_payload(b'{"a": 1}'), b'{"a": 1}')
+
+
+class TestStreaming(CompletionsTestCase):
+    """End-to-end parsing of streamed responses through MockTransport."""
+
+    def stream_body(self) -> list[bytes]:
+        body = b": keep-alive\r\n\r\nevent: message\r\n" + b"".join(_sse("He", "llo")).replace(b"\n", b"\r\n")
+        # [DONE] 之后的内容不应再被解析
+        body += b"data: not json\n\n"
+        # 按 3 字节切分，让事件和 CRLF 跨越多个块
+        return [body[i:i + 3] for i in range(0, len(body), 3)]
+
+    def test_sync_stream(self) -> None:
+        self.responses = [lambda: httpx.Response(200, stream=_ChunkedStream(self.stream_body()))]
+        completions = Completions(api_key="k", full_url="http://llm/v1/chat/completions")
+
+        received = [r.choices[0].delta.content for r in completions.create(self.parameter(stream=True))]
+
+        self.assertEqual(received, ["He", "llo"])
+        self.assertEqual(self.requests[0].headers["Accept"], "text/event-stream")
+
+    def test_async_stream(self) -> None:
+        self.responses = [lambda: httpx.Response(200, stream=_ChunkedStream(self.stream_body()))]
+        completions = AsyncCompletions(api_key="k", full_url="http://llm/v1/chat/completions")
+
+        self.assertEqual(self.run_async(completions, self.parameter(stream=True)), ["He", "llo"])
+
+
+class TestRetry(CompletionsTestCase):
+    """Only transient failures are retried."""
+
+    OK = {"id": "1", "choices": [{"index": 0, "message": {"role": "assistant", "content": "ok"}}]}
+
+    def test_client_error_is_not_retried(self) -> None:
+        for status in (400, 401, 404):
+            self.requests.clear()
+            self.responses = [lambda status=status: httpx.Response(status)]
+            completions = Completions(api_key="k", full_url="http://llm/v1/chat/completions", max_retry=3)
+
+            with self.assertRaises(httpx.HTTPStatusError):
+                list(completions.create(self.parameter()))
+            self.assertEqual(len(self.requests), 1, status)
+
+    def test_transient_error_is_retried(self) -> None:
+        for status in (429, 500, 503):
+            self.requests.clear()
+            self.responses = [lambda status=status: httpx.Response(status), lambda: httpx.Response(200, json=self.OK)]
+            completions = Completions(api_key="k", full_url="http://llm/v1/chat/completions", max_retry=3)
+
+            result = list(completions.create(self.parameter()))
+
+            self.assertEqual(result[0].choices[0].message.content, "ok")
+            self.assertEqual(len(self.requests), 2, status)
+
+    def test_async_transient_error_is_retried(self) -> None:
+        self.responses = [lambda: httpx.Response(503), lambda: httpx.Response(200, content=b"".join(_sse("A")))]
+        completions = AsyncCompletions(api_key="k", full_url="http://llm/v1/chat/completions", max_retry=3)
+
+        self.assertEqual(self.run_async(completions, self.parameter(stream=True)), ["A"])
+        self.assertEqual(len(self.requests), 2)
+
+    def test_gives_up_after_max_retry(self) -> None:
+        self.responses = [lambda: httpx.Response(500)]
+        completions = Completions(api_key="k", full_url="http://llm/v1/chat/completions", max_retry=3)
+
+        with self.assertRaises(httpx.HTTPStatusError):
+            list(completions.create(self.parameter()))
+        self.assertEqual(len(self.requests), 3)
+
+    def test_async_gives_up_after_max_retry(self) -> None:
+        self.responses = [lambda: httpx.Response(500)]
+        completions = AsyncCompletions(api_key="k", full_url="http://llm/v1/chat/completions", max_retry=3)
+
+        with self.assertRaises(httpx.HTTPStatusError):
+            self.run_async(completions, self.parameter(stream=True))
+        self.assertEqual(len(self.requests), 3)
+
+
+class TestMidStreamFailure(CompletionsTestCase):
+    """A stream that already produced output must not be restarted."""
+
+    def test_sync_stream_is_not_retried_after_output(self) -> None:
+        self.responses = [lambda: httpx.Response(200, stream=_BrokenStream(_sse("A")[:1]))]
+        completions = Completions(api_key="k", full_url="http://llm/v1/chat/completions", max_retry=3)
+
+        received = []
+        with self.assertRaises(httpx.ReadError):
+            for r in completions.create(self.parameter(stream=True)):
+                received.append(r.choices[0].delta.content)
+
+        self.assertEqual(received, ["A"])
+        self.assertEqual(len(self.requests), 1)
+
+    def test_async_stream_is_not_retried_after_output(self) -> None:
+        self.responses = [lambda: httpx.Response(200, stream=_BrokenStream(_sse("A")[:1]))]
+        completions = AsyncCompletions(api_key="k", full_url="http://llm/v1/chat/completions", max_retry=3)
+
+        with self.assertRaises(httpx.ReadError):
+            self.run_async(completions, self.parameter(stream=True))
+        self.assertEqual(len(self.requests), 1)
+
+    def test_stream_is_retried_before_output(self) -> None:
+        self.responses = [
+            lambda: httpx.Response(200, stream=_BrokenStream([])),
+            lambda: httpx.Response(200, content=b"".join(_sse("A", "B"))),
+        ]
+        completions = Completions(api_key="k", full_url="http://llm/v1/chat/completions", max_retry=3)
+
+        received = [r.choices[0].delta.content for r in completions.create(self.parameter(stream=True))]
+
+        self.assertEqual(received, ["A", "B"])
+        self.assertEqual(len(self.requests), 2)
+
+
+class TestCompletionCache(CompletionsTestCase):
+    """Deterministic (temperature 0) non-stream results are cached per credential."""
+
+    RESPONSE = {"id": "1", "choices": [{"index": 0, "message": {"role": "assistant", "content": "hi"}}]}
+
+    def test_same_request_hits_cache(self) -> None:
+        self.responses = [lambda: httpx.Response(200, json=self.RESPONSE)]
+        completions = Completions(api_key="k", full_url="http://llm/v1/chat/completions")
+
+        for _ in range(2):
+            result = list(completions.create(self.parameter(temperature=0)))
+            self.assertEqual(result[0].choices[0].message.content, "hi")
+        self.assertEqual(len(self.requests), 1)
+
+    def test_cache_is_scoped_to_api_key(self) -> None:
+        self.responses = [lambda: httpx.Response(200, json=self.RESPONSE)]
+        list(Completions(api_key="good", full_url="http://llm/v1/chat/completions")
+             .create(self.parameter(temperature=0)))
+
+        self.responses = [lambda: httpx.Response(401, json={"error": "invalid api key"})]
+        with self.assertRaises(httpx.HTTPStatusError):
+            list(Completions(api_key="bad", full_url="http://llm/v1/chat/completions")
+                 .create(self.parameter(temperature=0)))
+        self.assertEqual(len(self.requests), 2)
+
+
+class TestAsyncConcurrency(CompletionsTestCase):
+    """The concurrency semaphore follows the running event loop."""
+
+    def test_instance_is_reusable_across_event_loops(self) -> None:
+        self.responses = [lambda: httpx.Response(200, content=b"".join(_sse("A")))]
+        completions = AsyncCompletions(api_key="k", full_url="http://llm/v1/chat/completions", max_concurrency=2)
+
+        for _ in range(2):
+            self.assertEqual(self.run_async(completions, self.parameter(stream=True)), ["A"])
+        self.assertEqual(len(self.requests), 2)
+
+
+class TestModelParameters(unittest.TestCase):
+    """Transport settings given in the model parameter reach the completion clients."""
+
+    def test_parameters_are_passed_through(self) -> None:
+        from src.app.model_components.model.openai_style import OpenAiStyleLLMParameter, OpenAiStyleModel
+
+        model = OpenAiStyleModel(OpenAiStyleLLMParameter(
+            api_key="k", full_url="http://llm/v1/chat/completions",
+            rate_limit=5, compress=False, max_concurrency=4,
+        ))
+
+        self.assertEqual(model.completions.rate_limiter.rate, 5)
+        self.assertEqual(model.completions._headers["Accept-Encoding"], "identity")
+        self.assertIs(model.async_completions.rate_limiter, model.completions.rate_limiter)
+        self.assertEqual(model.async_completions.max_concurrency, 4)
+
+    def test_defaults(self) -> None:
+        from src.app.model_components.model.openai_style import OpenAiStyleLLMParameter, OpenAiStyleModel
+
+        model = OpenAiStyleModel(OpenAiStyleLLMParameter(api_key="k", full_url="http://llm/v1/chat/completions"))
+
+        self.assertIsNone(model.completions.rate_limiter)
+        self.assertNotIn("Accept-Encoding", model.completions._headers)
+        self.assertEqual(model.async_completions.max_concurrency, base.DEFAULT_MAX_CONCURRENCY)
+
+
+if __name__ == "__main__":
+    unittest.main()
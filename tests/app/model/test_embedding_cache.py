@@ -0,0 +1,146 @@
+"""
+Tests for OpenAiStyleEmbeddings: the per-text cache and the async batch API.
+
+Requests are served by an httpx.MockTransport installed as the shared client.
+"""
+
+import asyncio
+import json
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+from src.utils import http_util
+from src.app.model_components.model import embedding
+from src.app.model_components.model.constants import DEFAULT_EMBED_BATCH_SIZE
+from src.app.model_components.model.dto import BaseLLMParameter, EmbedParameter
+from src.app.model_components.model.embedding import OpenAiStyleEmbeddings
+
+
+class EmbeddingTestCase(unittest.TestCase):
+    """Base class that serves embedding requests from a MockTransport."""
+
+    def setUp(self) -> None:
+        self.inputs: list = []
+        self.status = 200
+        embedding._embedding_cache.clear()
+        self.client = httpx.Client(transport=httpx.MockTransport(self._handle))
+        patcher = patch.object(http_util, "_client", self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self) -> None:
+        self.client.close()
+        embedding._embedding_cache.clear()
+
+    def _handle(self, request: httpx.Request) -> httpx.Response:
+        query = json.loads(request.content)["input"]
+        self.inputs.append(query)
+        if self.status != 200:
+            return httpx.Response(self.status, json={"error": "invalid api key"})
+        texts = [query] if isinstance(query, str) else query
+        # 故意倒序返回，验证结果按 index 重新排列
+        data = [{"object": "embedding", "index": i, "embedding": [float(len(t)), 1.0]} for i, t in enumerate(texts)]
+        return httpx.Response(200, json={"data": data[::-1]})
+
+    @staticmethod
+    def model(api_key: str = "k") -> OpenAiStyleEmbeddings:
+        return OpenAiStyleEmbeddings(BaseLLMParameter(api_key=api_key, full_url="http://embed/v1/embeddings"))
+
+
+class TestEmbeddingCache(EmbeddingTestCase):
+    """Cached vectors are reused per text and scoped to the credentials."""
+
+    def test_only_missing_texts_are_requested(self) -> None:
+        model = self.model()
+        model.create(EmbedParameter(query=["a", "bb"]))
+        items = model.create(EmbedParameter(query=["bb", "ccc", "ccc"]))
+
+        self.assertEqual(self.inputs, [["a", "bb"], ["ccc"]])
+        self.assertEqual([item["index"] for item in items], [0, 1, 2])
+        self.assertEqual([item["embedding"][0] for item in items], [2.0, 3.0, 3.0])
+
+    def test_fully_cached_request_is_not_sent(self) -> None:
+        model = self.model()
+        first = model.create(EmbedParameter(query="abc"))
+        first[0]["embedding"].append(0.0)
+        second = model.create(EmbedParameter(query="abc"))
+
+        self.assertEqual(self.inputs, ["abc"])
+        self.assertEqual(second, [{"object": "embedding", "index": 0, "embedding": [3.0, 1.0]}])
+
+    def test_use_cache_false_bypasses_cache(self) -> None:
+        model = self.model()
+        for _ in range(2):
+            model.create(EmbedParameter(query=["a"], use_cache=False))
+
+        self.assertEqual(self.inputs, [["a"], ["a"]])
+        self.assertEqual(len(embedding._embedding_cache), 0)
+
+    def test_semantic_splitter_does_not_fill_shared_cache(self) -> None:
+        from src.app.model_components.doc_split.semantic_splitter import SemanticSplitterWithEmbedding
+
+        splitter = SemanticSplitterWithEmbedding(embedding_model=self.model())
+        splitter._embed(["a", "bb"])
+        splitter._embed(["a", "bb"])
+
+        self.assertEqual(self.inputs, [["a", "bb"]])
+        self.assertEqual(len(embedding._embedding_cache), 0)
+
+    def test_cache_is_scoped_to_api_key(self) -> None:
+        self.model("good").create(EmbedParameter(query=["a"]))
+
+        self.status = 401
+        with self.assertRaises(httpx.HTTPStatusError):
+            self.model("bad").create(EmbedParameter(query=["a"]))
+        self.assertEqual(len(self.inputs), 2)
+
+
+class TestAsyncEmbeddings(EmbeddingTestCase):
+    """async_create / async_batch_create behave like create."""
+
+    def run_async(self, make_coro):
+        async def run():
+            http_util._async_clients[asyncio.get_running_loop()] = httpx.AsyncClient(
+                transport=httpx.MockTransport(self._handle)
+            )
+            try:
+                return await make_coro()
+            finally:
+                await http_util.aclose_async_client()
+
+        return asyncio.run(run())
+
+    def test_batch_create_splits_by_batch_size(self) -> None:
+        texts = ["x" * (i + 1) for i in range(2 * DEFAULT_EMBED_BATCH_SIZE + 44)]
+        model = self.model()
+
+        items = self.run_async(lambda: model.async_batch_create(texts))
+
+        self.assertEqual(sorted(len(batch) for batch in self.inputs),
+                         [44, DEFAULT_EMBED_BATCH_SIZE, DEFAULT_EMBED_BATCH_SIZE])
+        self.assertEqual([item["index"] for item in items], list(range(len(texts))))
+        self.assertEqual([item["embedding"][0] for item in items], [float(len(t)) for t in texts])
+
+    def test_mixed_hits_and_misses_keep_input_order(self) -> None:
+        model = self.model()
+        self.run_async(lambda: model.async_create(EmbedParameter(query=["a", "ccc"])))
+
+        items = self.run_async(lambda: model.async_create(EmbedParameter(query=["bb", "a", "ccc", "dddd"])))
+
+        self.assertEqual(self.inputs, [["a", "ccc"], ["bb", "dddd"]])
+        self.assertEqual([item["index"] for item in items], [0, 1, 2, 3])
+        self.assertEqual([item["embedding"][0] for item in items], [2.0, 1.0, 3.0, 4.0])
+
+    def test_cache_is_scoped_to_api_key(self) -> None:
+        self.run_async(lambda: self.model("good").async_create(EmbedParameter(query=["a"])))
+
+        self.status = 401
+        with self.assertRaises(httpx.HTTPStatusError):
+            self.run_async(lambda: self.model("bad").async_create(EmbedParameter(query=["a"])))
+        self.assertEqual(len(self.inputs), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
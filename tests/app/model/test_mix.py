@@ -0,0 +1,109 @@
+"""
+Tests for the retry behaviour of Mix.generate / Mix.async_generate, using httpx.MockTransport.
+"""
+
+import asyncio
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+from src.utils import http_util
+from src.app.model_components.model import mix
+from src.app.model_components.model.dto import BaseCompletionParameter
+from src.app.model_components.model.mix import Mix, MixLLMParameter
+
+OK = {"Response": "ok", "Response_wm": "ok", "prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+
+
+async def _no_wait(_delay: float) -> None:
+    return None
+
+
+class TestMixRetry(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.statuses: list[int] = []
+        self.requests: list[httpx.Request] = []
+        self.client = httpx.Client(transport=httpx.MockTransport(self._handle))
+        for patcher in (
+            patch.object(http_util, "_client", self.client),
+            patch.object(mix.time, "sleep", lambda _delay: None),
+            patch.object(mix.asyncio, "sleep", _no_wait),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.model = Mix(MixLLMParameter(api_key="k", full_url="http://mix/v1/chat/completions", max_retry=3))
+        self.parameter = BaseCompletionParameter(messages=[{"role": "user", "content": "hi"}])
+
+    def tearDown(self) -> None:
+        self.client.close()
+
+    def _handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        status = self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+        return httpx.Response(status, json=OK if status == 200 else {"error": status})
+
+    def generate_async(self) -> list:
+        async def run() -> list:
+            http_util._async_clients[asyncio.get_running_loop()] = httpx.AsyncClient(
+                transport=httpx.MockTransport(self._handle)
+            )
+            try:
+                return [r async for r in self.model.async_generate(self.parameter)]
+            finally:
+                await http_util.aclose_async_client()
+
+        return asyncio.run(run())
+
+    def test_server_error_recovers(self) -> None:
+        self.statuses = [503, 200]
+
+        result = self.model.generate(self.parameter)
+
+        self.assertEqual(result.choices[0].message.content, "ok")
+        self.assertEqual(len(self.requests), 2)
+
+    def test_retries_exhausted_raise_with_cause(self) -> None:
+        self.statuses = [500]
+
+        with self.assertRaises(Exception) as ctx:
+            self.model.generate(self.parameter)
+
+        self.assertIsInstance(ctx.exception.__cause__, httpx.HTTPStatusError)
+        self.assertEqual(len(self.requests), 3)
+
+    def test_client_error_is_not_retried(self) -> None:
+        self.statuses = [400]
+
+        with self.assertRaises(httpx.HTTPStatusError):
+            self.model.generate(self.parameter)
+        self.assertEqual(len(self.requests), 1)
+
+    def test_async_server_error_recovers(self) -> None:
+        self.statuses = [429, 200]
+
+        results = self.generate_async()
+
+        self.assertEqual([r.choices[0].message.content for r in results], ["ok"])
+        self.assertEqual(len(self.requests), 2)
+
+    def test_async_retries_exhausted_raise_with_cause(self) -> None:
+        self.statuses = [502]
+
+        with self.assertRaises(Exception) as ctx:
+            self.generate_async()
+
+        self.assertIsInstance(ctx.exception.__cause__, httpx.HTTPStatusError)
+        self.assertEqual(len(self.requests), 3)
+
+    def test_async_client_error_is_not_retried(self) -> None:
+        self.statuses = [401]
+
+        with self.assertRaises(httpx.HTTPStatusError):
+            self.generate_async()
+        self.assertEqual(len(self.requests), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+"""
+Tests for the retry/rate-limit helpers in retry_util and the LRU cache in cache_util.
+"""
+
+import asyncio
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+from src.utils import retry_util
+from src.utils.cache_util import LRUCache, digest_key
+
+
+def _status_error(status: int, headers: dict | None = None) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "http://llm/v1/chat/completions")
+    response = httpx.Response(status, headers=headers, request=request)
+    return httpx.HTTPStatusError(f"HTTP {status}", request=request, response=response)
+
+
+class TestIsRetryable(unittest.TestCase):
+
+    def test_client_errors_are_not_retryable(self) -> None:
+        for status in (400, 401, 403, 404, 422):
+            self.assertFalse(retry_util.is_retryable(_status_error(status)), status)
+
+    def test_transient_errors_are_retryable(self) -> None:
+        for status in (429, 500, 502, 503):
+            self.assertTrue(retry_util.is_retryable(_status_error(status)), status)
+        self.assertTrue(retry_util.is_retryable(httpx.ReadError("connection reset")))
+        self.assertTrue(retry_util.is_retryable(ValueError("invalid response")))
+
+
+class TestBackoffDelay(unittest.TestCase):
+
+    def test_exponential_growth_with_jitter(self) -> None:
+        for attempt in (1, 2, 3):
+            delay = retry_util.backoff_delay(attempt)
+            low = retry_util.BACKOFF_BASE * 2 ** (attempt - 1)
+            self.assertGreaterEqual(delay, low)
+            self.assertLess(delay, low + retry_util.BACKOFF_BASE)
+
+    def test_capped_at_maximum(self) -> None:
+        self.assertEqual(retry_util.backoff_delay(30), retry_util.BACKOFF_MAX)
+        self.assertEqual(retry_util.backoff_delay(1, _status_error(429, {"Retry-After": "3600"})),
+                         retry_util.BACKOFF_MAX)
+
+    def test_honours_retry_after(self) -> None:
+        self.assertGreaterEqual(retry_util.backoff_delay(1, _status_error(429, {"Retry-After": "2"})), 2.0)
+        # 非数字的 Retry-After（HTTP 日期）被忽略
+        delay = retry_util.backoff_delay(1, _status_error(503, {"Retry-After": "Wed, 21 Oct 2026 07:28:00 GMT"}))
+        self.assertLess(delay, 2 * retry_util.BACKOFF_BASE)
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_burst_up_to_capacity_then_wait(self) -> None:
+        with patch.object(retry_util.time, "monotonic", return_value=100.0):
+            bucket = retry_util.TokenBucket(rate=2, capacity=3)
+            waits = [bucket._reserve() for _ in range(5)]
+        self.assertEqual(waits, [0.0, 0.0, 0.0, 0.5, 1.0])
+
+    def test_tokens_refill_over_time(self) -> None:
+        with patch.object(retry_util.time, "monotonic", side_effect=[100.0, 100.0, 100.0, 101.0]):
+            bucket = retry_util.TokenBucket(rate=1)
+            self.assertEqual(bucket._reserve(), 0.0)
+            self.assertEqual(bucket._reserve(), 1.0)
+            # 一秒后补充的令牌已被上一次预约占用，不能超额获取
+            self.assertEqual(bucket._reserve(), 1.0)
+
+    def test_acquire_sleeps_for_reserved_wait(self) -> None:
+        bucket = retry_util.TokenBucket(rate=4, capacity=1)
+        sleeps = []
+        with patch.object(bucket, "_reserve", side_effect=[0.0, 0.25]), \
+                patch.object(retry_util.time, "sleep", sleeps.append):
+            bucket.acquire()
+            bucket.acquire()
+        self.assertEqual(sleeps, [0.25])
+
+    def test_aacquire_does_not_block_loop(self) -> None:
+        bucket = retry_util.TokenBucket(rate=4, capacity=1)
+        sleeps = []
+
+        async def fake_sleep(delay: float) -> None:
+            sleeps.append(delay)
+
+        with patch.object(bucket, "_reserve", side_effect=[0.0, 0.25]), \
+                patch.object(retry_util.asyncio, "sleep", fake_sleep):
+            asyncio.run(bucket.aacquire())
+            asyncio.run(bucket.aacquire())
+        self.assertEqual(sleeps, [0.25])
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_hit_and_miss(self) -> None:
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("b", 0), 0)
+
+    def test_evicts_least_recently_used(self) -> None:
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((cache.get("a"), cache.get("c")), (1, 3))
+
+    def test_put_existing_key_refreshes_it(self) -> None:
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.put("a", 10)
+        cache.put("c", 3)
+
+        self.assertEqual(cache.get("a"), 10)
+        self.assertIsNone(cache.get("b"))
+
+    def test_clear(self) -> None:
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+
+class TestDigestKey(unittest.TestCase):
+
+    def test_stable_and_fixed_size(self) -> None:
+        self.assertEqual(digest_key("a", b"b"), digest_key(b"a", "b"))
+        self.assertEqual(len(digest_key("x" * 10_000)), 16)
+
+    def test_part_boundaries_matter(self) -> None:
+        self.assertNotEqual(digest_key("ab", "c"), digest_key("a", "bc"))
+        self.assertNotEqual(digest_key("a", "b"), digest_key("b", "a"))
+
+
+if __name__ == "__main__":
+    unittest.main()